@@ -29,6 +29,7 @@ else:
     )
     from .plugins.folding import (
         MdeAutoFoldListener,
+        MdeFoldAllBlocksCommand,
         MdeFoldAllSectionsCommand,
         MdeFoldLinksCommand,
         MdeFoldSectionCommand,
@@ -42,20 +43,34 @@ else:
         MdeGotoFootnoteReferenceCommand,
         MdeInsertFootnoteCommand,
         MdeMagicFootnotesCommand,
+        MdeRenumberFootnotesCommand,
         MdeSortFootnotesCommand,
         MdeSwitchToFromFootnoteCommand,
+        MdeFootnoteTracker,
         MdeMarkFootnotesListener,
     )
     from .plugins.headings import (
+        MdeAnchorListener,
+        MdeBreadcrumbListener,
         MdeChangeHeadingsLevelCommand,
         MdeCompleteUnderlinedHeadingsCommand,
         MdeConvertUnderlinedHeadingsToAtxCommand,
         MdeFixUnderlinedHeadingsCommand,
         MdeGotoNextHeadingCommand,
         MdeGotoPreviousHeadingCommand,
+        MdeGotoProjectHeadingCommand,
         MdeMatchHeadingHashesCommand,
         MdeMatchHeadingHashesDetector,
+        MdeMoveSectionDownCommand,
+        MdeMoveSectionUpCommand,
+        MdeProjectHeadingIndexer,
+        MdeShowOutlineCommand,
+        MdeShowSectionStatisticsCommand,
+        MdeTocUpdater,
         MdeUnsavedViewNameSetter,
+        MdeUpdateTocCommand,
+        MdeValidateLinksCommand,
+        MdeValidateProjectLinksCommand,
     )
     from .plugins.lists import (
         MdeIndentListItemCommand,
@@ -98,6 +113,7 @@ else:
         MdeReplaceSelectedCommand,
         MdeToggleCenteredLineCommand,
         MdeCenteredLineKeeper,
+        MdeViewCacheListener,
     )
     from .plugins.wiki_page import (
         MdeListBackLinksCommand,
@@ -0,0 +1,248 @@
+"""
+A Sublime Text independent scanner for Markdown block structure.
+
+The scanner classifies each line of a text in a single linear pass and stores
+results in compact arrays, so it can be used from background threads and be
+unit-tested or benchmarked with plain CPython.
+"""
+
+import bisect
+import re
+
+from array import array
+
+BLANK = 0
+TEXT = 1
+FRONTMATTER = 2
+FENCE = 3
+CODE = 4
+HEADING = 5
+UNDERLINE = 6
+HR = 7
+LIST_ITEM = 8
+LIST_CONTINUATION = 9
+QUOTE = 10
+REFERENCE = 11
+FOOTNOTE = 12
+TABLE = 13
+
+KIND_NAMES = (
+    "blank",
+    "text",
+    "frontmatter",
+    "fence",
+    "code",
+    "heading",
+    "underline",
+    "hr",
+    "list_item",
+    "list_continuation",
+    "quote",
+    "reference",
+    "footnote",
+    "table",
+)
+
+FRONTMATTER_BEGIN_RE = re.compile(r"---[ \t]*$")
+FRONTMATTER_END_RE = re.compile(r"(?:---|\.\.\.)[ \t]*$")
+FENCE_RE = re.compile(r"[ \t]{0,3}(`{3,}|~{3,})")
+ATX_RE = re.compile(r"[ \t]{0,3}(#{1,6})(?:[ \t]|$)")
+UNDERLINE_RE = re.compile(r"[ \t]{0,3}(?:=+|-+)[ \t]*$")
+HR_RE = re.compile(r"[ \t]{0,3}([-*_])(?:[ \t]*\1){2,}[ \t]*$")
+LIST_ITEM_RE = re.compile(r"([ \t]*)(?:[-+*]|\d{1,9}[.)])(?:[ \t]|$)")
+QUOTE_RE = re.compile(r"[ \t]{0,3}((?:>[ \t]?)+)")
+FOOTNOTE_RE = re.compile(r"[ \t]{0,3}\[\^[^\]]+\]:")
+REFERENCE_RE = re.compile(r"[ \t]{0,3}\[[^\]]+\]:[ \t]*\S")
+TABLE_DELIMITER_RE = re.compile(r"[ \t]*\|?(?:[ \t]*:?-+:?[ \t]*\|)+(?:[ \t]*:?-+:?[ \t]*)?$")
+
+
+class Blocks:
+    """
+    This class describes the result of scanning a text for Markdown blocks.
+
+    - `offsets[i]` is the text position line `i` begins at, `offsets[-1]` is the text length.
+    - `kinds[i]` is the kind of line `i`, one of the module level constants.
+    - `levels[i]` is the heading level of `HEADING` lines, the indentation width of
+      `LIST_ITEM` lines, the nesting depth of `QUOTE` lines and `0` otherwise.
+    """
+
+    __slots__ = ["offsets", "kinds", "levels"]
+
+    def __init__(self):
+        self.offsets = array("q")
+        self.kinds = array("B")
+        self.levels = array("B")
+
+    def __len__(self):
+        return len(self.kinds)
+
+    def line_at(self, pt):
+        """
+        Return the number of the line, text position `pt` is located in.
+        """
+        return max(0, min(len(self.kinds) - 1, bisect.bisect_right(self.offsets, pt) - 1))
+
+    def line_region(self, line):
+        """
+        Return `(begin, end)` text positions of a line, excluding its line ending.
+        """
+        begin = self.offsets[line]
+        end = self.offsets[line + 1]
+        if end > begin and line + 1 < len(self.kinds):
+            end -= 1
+        return (begin, end)
+
+    def lines(self, kind):
+        """
+        Generate numbers of all lines of given kind.
+        """
+        kinds = self.kinds
+        for i in range(len(kinds)):
+            if kinds[i] == kind:
+                yield i
+
+    def headings(self):
+        """
+        Generate `(line, level)` tuples of all ATX and setext headings.
+        """
+        levels = self.levels
+        for i in self.lines(HEADING):
+            yield (i, levels[i])
+
+    def runs(self, kinds):
+        """
+        Generate `(first_line, last_line)` tuples of consecutive lines of any of `kinds`.
+
+        Consecutive lines, which form separate fenced code blocks, are not merged.
+        """
+        all_kinds = self.kinds
+        first = -1
+        for i in range(len(all_kinds)):
+            kind = all_kinds[i]
+            if kind in kinds:
+                if first < 0:
+                    first = i
+                # a fence following a fenced block's closing fence opens a new block
+                elif kind == FENCE and all_kinds[i - 1] == FENCE and self.levels[i]:
+                    yield (first, i - 1)
+                    first = i
+            elif first >= 0:
+                yield (first, i - 1)
+                first = -1
+        if first >= 0:
+            yield (first, len(all_kinds) - 1)
+
+
+def scan(text):
+    """
+    Classify all lines of a Markdown text in a single pass.
+
+    :param text:  The text to scan
+
+    :returns:  The `Blocks` of the text
+    """
+    blocks = Blocks()
+    offsets = blocks.offsets
+    kinds = blocks.kinds
+    levels = blocks.levels
+
+    fence = None
+    in_frontmatter = False
+    size = len(text)
+    begin = 0
+    while True:
+        end = text.find("\n", begin)
+        if end < 0:
+            end = size
+        line = text[begin:end]
+        offsets.append(begin)
+        prev = kinds[-1] if kinds else BLANK
+        kind = TEXT
+        level = 0
+
+        if in_frontmatter:
+            kind = FRONTMATTER
+            if FRONTMATTER_END_RE.match(line):
+                in_frontmatter = False
+
+        elif fence:
+            kind = CODE
+            stripped = line.strip()
+            if stripped.startswith(fence) and not stripped.strip(fence[0]):
+                kind = FENCE
+                fence = None
+
+        elif not line.strip():
+            kind = BLANK
+
+        elif begin == 0 and FRONTMATTER_BEGIN_RE.match(line):
+            kind = FRONTMATTER
+            in_frontmatter = True
+
+        else:
+            m = FENCE_RE.match(line)
+            if m and not (m.group(1)[0] == "`" and "`" in line[m.end() :]):
+                kind = FENCE
+                level = 1
+                fence = m.group(1)
+
+            elif prev == TEXT and UNDERLINE_RE.match(line):
+                kind = UNDERLINE
+                kinds[-1] = HEADING
+                levels[-1] = 1 if line.strip()[0] == "=" else 2
+
+            elif HR_RE.match(line):
+                kind = HR
+
+            else:
+                m = ATX_RE.match(line)
+                if m:
+                    kind = HEADING
+                    level = len(m.group(1))
+                else:
+                    m = QUOTE_RE.match(line)
+                    if m:
+                        kind = QUOTE
+                        level = min(255, m.group(1).count(">"))
+                    else:
+                        m = LIST_ITEM_RE.match(line)
+                        if m:
+                            kind = LIST_ITEM
+                            level = min(255, len(m.group(1).expandtabs(4)))
+                        elif FOOTNOTE_RE.match(line):
+                            kind = FOOTNOTE
+                        elif REFERENCE_RE.match(line):
+                            kind = REFERENCE
+                        elif TABLE_DELIMITER_RE.match(line) and prev == TEXT and "|" in line:
+                            kind = TABLE
+                            kinds[-1] = TABLE
+                        elif prev == TABLE and "|" in line:
+                            kind = TABLE
+                        elif prev in (LIST_ITEM, LIST_CONTINUATION) or (
+                            prev == BLANK and line[:1] in (" ", "\t") and _in_list(kinds)
+                        ):
+                            kind = LIST_CONTINUATION
+                        elif prev == QUOTE:
+                            # lazy continuation
+                            kind = QUOTE
+                            level = levels[-1]
+
+        kinds.append(kind)
+        levels.append(level)
+        if end >= size:
+            break
+        begin = end + 1
+
+    offsets.append(size)
+    return blocks
+
+
+def _in_list(kinds):
+    """
+    Check whether the last non-blank line belongs to a list.
+    """
+    for i in range(len(kinds) - 1, -1, -1):
+        kind = kinds[i]
+        if kind != BLANK:
+            return kind in (LIST_ITEM, LIST_CONTINUATION)
+    return False
@@ -0,0 +1,29 @@
+"""
+A Sublime Text independent set of text ranges with logarithmic lookup.
+"""
+
+import bisect
+
+
+class Intervals:
+    """
+    This class describes sorted, non-overlapping ranges of text positions.
+
+    It answers whether a text position is located within any of them in O(log n).
+    """
+
+    __slots__ = ["begins", "ends"]
+
+    def __init__(self, ranges=()):
+        """
+        :param ranges:  An iterable of sorted, non-overlapping `(begin, end)` tuples
+        """
+        self.begins = []
+        self.ends = []
+        for begin, end in ranges:
+            self.begins.append(begin)
+            self.ends.append(end)
+
+    def __contains__(self, pt):
+        i = bisect.bisect_right(self.begins, pt) - 1
+        return i >= 0 and pt < self.ends[i]
@@ -0,0 +1,47 @@
+"""
+Sublime Text independent helpers to persist versioned JSON cache files.
+
+Cache files contain an object with the format `version` and the cached `files`.
+They are written to a temporary file first, which then replaces the cache file,
+so a cache file is never left half written.
+"""
+
+import json
+import os
+
+
+def load_json_cache(cache_file, version, object_pairs_hook=None):
+    """
+    Load the cached files of a JSON cache file.
+
+    :param cache_file:         The absolute path of the cache file
+    :param version:            The expected format version
+    :param object_pairs_hook:  The optional `json.load()` hook to create objects with
+
+    :returns:  The cached files or `None`, if the cache file is missing, corrupt or outdated
+    """
+    try:
+        with open(cache_file, encoding="utf-8") as f:
+            data = json.load(f, object_pairs_hook=object_pairs_hook)
+        if data.get("version") == version:
+            return data["files"]
+    except (OSError, ValueError, KeyError):
+        pass
+    return None
+
+
+def save_json_cache(cache_file, version, files):
+    """
+    Save cached files to a JSON cache file.
+
+    :param cache_file:  The absolute path of the cache file
+    :param version:     The format version
+    :param files:       The JSON serializable files to cache
+
+    :raises OSError:  If the cache file can't be written
+    """
+    os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+    tmp_file = cache_file + ".tmp"
+    with open(tmp_file, "w", encoding="utf-8") as f:
+        json.dump({"version": version, "files": files}, f)
+    os.replace(tmp_file, cache_file)
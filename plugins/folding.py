@@ -1,25 +1,230 @@
+import bisect
+import hashlib
+import os
+import threading
 import sublime
 
-from .headings import all_headings
-from .view import MdeTextCommand, MdeViewEventListener
+from collections import OrderedDict
+
+from .core import blocks
+from .core.json_cache import load_json_cache, save_json_cache
+from .headings import heading_index
+from .logging import logger
+from .view import (
+    MdeTextCommand,
+    MdeViewEventListener,
+    block_index,
+    region_cache,
+    register_view_cache,
+)
 
 ST4 = int(sublime.version()) > 4000
 
+package_name = __package__.split(".")[0]
+
 
 def folding_target_level(view):
     return view.settings().get("mde.folding.target_level", -1)
 
 
-def folded_region(view, region):
+def url_selector(view):
+    return view.settings().get("mde.auto_fold_link.selector", "")
+
+
+class BufferViews:
     """
-    Find first unfolded selection.
+    This class describes a cache of all views of each buffer.
+
+    Views of a buffer are looked up in all windows only the first time one of them asks for
+    its clones. Closed views are dropped via `register_view_cache()`.
+    """
+
+    def __init__(self):
+        self.views = {}
+
+    def get(self, view):
+        """
+        Return all views of a view's buffer.
+
+        :param view:  The view
+
+        :returns:  A list of views
+        """
+        buffer_id = view.buffer_id()
+        views = self.views.get(buffer_id)
+        if views is None or all(v.id() != view.id() for v in views):
+            views = [
+                other
+                for window in sublime.windows()
+                for other in window.views()
+                if other.buffer_id() == buffer_id
+            ]
+            if all(v.id() != view.id() for v in views):
+                views.append(view)
+            self.views[buffer_id] = views
+        return views
+
+    def pop(self, view_id, default=None):
+        """
+        Drop a closed view.
+
+        :param view_id:  The id of the view
+        :param default:  Ignored, it makes the cache compatible with `register_view_cache()`
+        """
+        for buffer_id, views in list(self.views.items()):
+            others = [v for v in views if v.id() != view_id]
+            if len(others) == len(views):
+                continue
+            if others:
+                self.views[buffer_id] = others
+            else:
+                del self.views[buffer_id]
+
+
+_buffer_views = register_view_cache(BufferViews())
+
+
+def shared_views(view):
+    """
+    Returns all views of a view's buffer, if `mde.folding.share_views` is enabled.
 
     :param view:  The view
+
+    :returns:   A list of views beginning with `view`
+    """
+    if not view.settings().get("mde.folding.share_views", False):
+        return [view]
+    return [view] + [other for other in _buffer_views.get(view) if other.id() != view.id()]
+
+
+def model_view(view):
+    """
+    Returns the view whose cached headings, urls and blocks are used to compute folds.
+
+    Views sharing a buffer use the one with lowest id, if `mde.folding.share_views` is enabled,
+    so folds are computed only once for all of them.
+
+    :param view:  The view
+
+    :returns:   The view to compute folds for
+    """
+    views = shared_views(view)
+    return min(views, key=lambda v: v.id()) if len(views) > 1 else view
+
+
+def adopt_folds(view):
+    """
+    Fold sections and blocks of a new view like the other views of its buffer.
+
+    :param view:  The view
+    """
+    views = shared_views(view)
+    if len(views) < 2 or view.folded_regions():
+        return
+    source = views[1]
+    urls = {(url.begin(), url.end()) for url in url_regions(view)}
+    fold_regions(
+        view,
+        [r for r in folded_regions(source).regions if (r.begin(), r.end()) not in urls],
+    )
+    target_level = source.settings().get("mde.folding.target_level")
+    if target_level is not None:
+        view.settings().set("mde.folding.target_level", target_level)
+
+
+class FoldedRegions:
+    """
+    This class describes the sorted folded regions of a view.
+
+    Folded regions don't overlap, so the only candidate to contain a region is found
+    by bisecting their begins in O(log n) instead of scanning all of them.
+    """
+
+    __slots__ = ["folded", "regions", "begins", "ends"]
+
+    def __init__(self, folded):
+        self.folded = folded
+        self.regions = sorted(folded, key=lambda r: r.begin())
+        self.begins = [r.begin() for r in self.regions]
+        self.ends = [r.end() for r in self.regions]
+
+    def __len__(self):
+        return len(self.regions)
+
+    def containing(self, region):
+        """
+        Return the folded region containing `region` or `None`.
+        """
+        i = bisect.bisect_right(self.begins, region.begin()) - 1
+        if i >= 0 and self.ends[i] >= region.end():
+            return self.regions[i]
+        return None
+
+    def contained(self, region):
+        """
+        Return whether any folded region is contained by `region`.
+        """
+        i = bisect.bisect_left(self.begins, region.begin())
+        return i < len(self.begins) and self.ends[i] <= region.end()
+
+
+_folded_regions = register_view_cache({})
+
+
+def folded_regions(view):
     """
-    for i in view.folded_regions():
-        if i.contains(region):
-            return i
-    return None
+    Return the cached folded regions of a view.
+
+    Folds may change without modifying content or running any command,
+    so the cache is validated against the view's current folded regions
+    and lookup arrays are rebuilt only if they differ.
+
+    Callers should keep the result for all lookups of a command run.
+
+    :param view:  The view
+
+    :returns:  The `FoldedRegions` of the view
+    """
+    folded = view.folded_regions()
+    index = _folded_regions.get(view.id())
+    if index is None or index.folded != folded:
+        index = FoldedRegions(folded)
+        _folded_regions[view.id()] = index
+    return index
+
+
+def fold_regions(view, regions):
+    """
+    Fold regions and invalidate cached folded regions.
+
+    :param view:     The view
+    :param regions:  The region or list of regions to fold
+    """
+    view.fold(regions)
+    _folded_regions.pop(view.id(), None)
+
+
+def unfold_regions(view, regions):
+    """
+    Unfold regions and invalidate cached folded regions.
+
+    :param view:     The view
+    :param regions:  The region or list of regions to unfold
+    """
+    view.unfold(regions)
+    _folded_regions.pop(view.id(), None)
+
+
+def folded_region(view, region):
+    """
+    Find folded region, which contains given `region`.
+
+    :param view:    The view
+    :param region:  The region to find the folded region for
+
+    :returns:  The folded region or `None`
+    """
+    return folded_regions(view).containing(region)
 
 
 def first_unfolded_selection(view):
@@ -28,9 +233,9 @@ def first_unfolded_selection(view):
 
     :param view:  The view
     """
-    folded_regions = view.folded_regions()
+    folded = folded_regions(view)
     for sel in view.sel():
-        if not any(r.contains(sel) for r in folded_regions):
+        if not folded.containing(sel):
             return sel
     return sublime.Region(0, 0)
 
@@ -56,20 +261,18 @@ def section_level(view, pt):
 
     :returns:             The section level
     """
-    last_level = 0
-    for heading_begin, heading_end, level in all_headings(view):
-        if heading_end < pt:
-            last_level = level
-        elif heading_begin < pt:
-            return level
-        else:
-            return last_level
+    index = heading_index(model_view(view))
+    i = bisect.bisect_left(index.begins, pt) - 1
+    return index.levels[i] if i >= 0 else 0
 
 
 def section_region_and_level(view, pt, target_level):
     """
     Calculate `region` and heading level of the section `pt` is in.
 
+    The enclosing section is looked up by bisecting the view's cached heading index,
+    which is rebuilt only if content changed.
+
     :param view:          The view
     :param region:        The text position to find the section's region for
     :param target_level:  The level a section must have to be folded
@@ -78,18 +281,17 @@ def section_region_and_level(view, pt, target_level):
         region of the whole section including all its child sections, if `target_level` < 9
         region between previous and next heading, if `target_level` is 9
     """
-    section_start = -1
-    section_end = view.size()
-    section_level = 0
-    for heading_begin, heading_end, heading_level in all_headings(view):
-        if heading_begin <= pt:
-            section_start = heading_end
-            section_level = heading_level
-        elif (section_level >= heading_level) or (target_level == 0 and section_start > 0):
-            section_end = heading_begin - 1
-            break
-    if section_start >= 0 and section_end > section_start:
-        return (sublime.Region(section_start, section_end), section_level)
+    index = heading_index(model_view(view))
+    i = index.heading_at(pt)
+    if i < 0:
+        return (None, -1)
+
+    section_start = index.ends[i]
+    # outline mode sections end at next heading, others at next heading of same or lower level
+    j = i + 1 if target_level == 0 else index.subtree_ends[i]
+    section_end = index.begins[j] - 1 if j < len(index) else view.size()
+    if section_end > section_start:
+        return (sublime.Region(section_start, section_end), index.levels[i])
     return (None, -1)
 
 
@@ -108,8 +310,12 @@ def sections_to_fold(view, region, target_level):
     section_start = -1
     section_end = region.end()
 
-    for heading_begin, heading_end, heading_level in all_headings(
-        view, region.begin(), region.end()
+    index = heading_index(model_view(view))
+    first = bisect.bisect_left(index.begins, region.begin())
+    last = bisect.bisect_right(index.ends, region.end(), first)
+
+    for heading_begin, heading_end, heading_level in zip(
+        index.begins[first:last], index.ends[first:last], index.levels[first:last]
     ):
         if target_level == 0 or heading_level <= target_level and section_start > 0:
             section_end = heading_begin - 1
@@ -126,29 +332,76 @@ def url_regions(view):
     """
     Returns a list of all url regions specified by `"mde.auto_fold_link.selector"`.
 
-    It caches the current view's regions to reduce api calls. Regions are fetched from API
-    whenever the function is called for another view or its content changed. It is just to prevent
-    API calls everytime caret is moved around.
+    Regions are taken from the shared region cache to reduce api calls. They are fetched from
+    API only if the view's content changed. It is just to prevent API calls everytime caret is
+    moved around or views are switched.
 
     :param view:  The view
 
     :returns:   A list of regions
     """
-    view_id = view.id()
-    change_count = view.change_count()
+    return region_cache.find_by_selector(model_view(view), url_selector(view))
 
-    try:
-        if url_regions.view_id == view_id and url_regions.change_count == change_count:
-            return url_regions.regions
-    except AttributeError:
-        pass
 
-    url_regions.view_id = view_id
-    url_regions.change_count = change_count
-    url_regions.regions = view.find_by_selector(
-        view.settings().get("mde.auto_fold_link.selector", "")
-    )
-    return url_regions.regions
+def selected_urls(view):
+    """
+    Returns the set of indexes of url regions a caret is located within.
+
+    Url regions are sorted and don't overlap, so the only candidate for each selection
+    is found by bisecting the regions' begins.
+
+    :param view:  The view
+
+    :returns:   A set of indexes into `url_regions(view)`
+    """
+    regions = url_regions(view)
+    begins = region_cache.begins(model_view(view), url_selector(view))
+    selected = set()
+    for sel in view.sel():
+        i = bisect.bisect_right(begins, sel.begin()) - 1
+        if i >= 0 and regions[i].contains(sel):
+            selected.add(i)
+    return selected
+
+
+def viewport_urls(view):
+    """
+    Returns the range of url regions located within or near the visible region.
+
+    The visible region is extended by its size in both directions,
+    so scrolling doesn't immediately reveal unfolded urls.
+
+    :param view:  The view
+
+    :returns:   A `(first, last)` tuple of indexes into `url_regions(view)`
+    """
+    visible = view.visible_region()
+    margin = visible.size()
+    begins = region_cache.begins(model_view(view), url_selector(view))
+    first = bisect.bisect_left(begins, visible.begin() - margin)
+    last = bisect.bisect_right(begins, visible.end() + margin, first)
+    return (first, last)
+
+
+class UrlFolding:
+    """
+    This class describes the state of automatic url folding of a view.
+
+    :ivar change_count:  The view's change count the state is valid for
+    :ivar unfolded:      The set of indexes of url regions unfolded because of a caret
+    :ivar folded:        A flag per url region, which is set once it was folded,
+                         or `None` if all urls were folded at once
+    """
+
+    __slots__ = ["change_count", "unfolded", "folded"]
+
+    def __init__(self, change_count, unfolded, folded=None):
+        self.change_count = change_count
+        self.unfolded = unfolded
+        self.folded = folded
+
+
+_url_foldings = register_view_cache({})
 
 
 def urls_to_fold(view):
@@ -157,15 +410,34 @@ def urls_to_fold(view):
 
     Returns all url regions but those a caret is placed within or which are partly selected.
 
+    If a view contains more urls than `mde.auto_fold_link.viewport_threshold`,
+    only those within or near the visible region are returned. Others are folded
+    by `fold_visible_urls()` once they are scrolled into view.
+
     :param view:    The view
-    :param region:  The region urls to return for.
 
     :returns:   A list of regions
     """
     if not view.settings().get("mde.auto_fold_link.enabled", True):
         return []
 
-    return [url for url in url_regions(view) if not any(url.contains(sel) for sel in view.sel())]
+    regions = url_regions(view)
+    selected = selected_urls(view)
+    state = UrlFolding(view.change_count(), selected)
+    _url_foldings[view.id()] = state
+
+    threshold = view.settings().get("mde.auto_fold_link.viewport_threshold", 1000)
+    if not threshold or len(regions) <= threshold:
+        return [url for i, url in enumerate(regions) if i not in selected]
+
+    state.folded = bytearray(len(regions))
+    first, last = viewport_urls(view)
+    urls = []
+    for i in range(first, last):
+        if i not in selected:
+            state.folded[i] = 1
+            urls.append(regions[i])
+    return urls
 
 
 def fold_urls(view):
@@ -177,16 +449,69 @@ def fold_urls(view):
 
     :param view:  The view
     """
-    fold_regions = []
-    unfold_regions = []
-    for url in url_regions(view):
-        if any(url.contains(sel) for sel in view.sel()):
-            unfold_regions.append(url)
-        else:
-            fold_regions.append(url)
+    fold_regions(view, urls_to_fold(view))
+    state = _url_foldings.get(view.id())
+    if state:
+        regions = url_regions(view)
+        unfold_regions(view, [regions[i] for i in state.unfolded])
+
+
+def refold_urls(view):
+    """
+    Update folding of urls after selections were modified.
 
-    view.fold(fold_regions)
-    view.unfold(unfold_regions)
+    Only urls a caret entered are unfolded and only those a caret left are folded again.
+    All urls are folded from scratch, if content changed since last time.
+
+    :param view:  The view
+    """
+    state = _url_foldings.get(view.id())
+    if state is None or state.change_count != view.change_count():
+        fold_urls(view)
+        return
+
+    regions = url_regions(view)
+    selected = selected_urls(view)
+    unfolded = state.unfolded
+    if selected != unfolded:
+        fold_regions(view, [regions[i] for i in unfolded - selected])
+        unfold_regions(view, [regions[i] for i in selected - unfolded])
+        if state.folded is not None:
+            for i in unfolded - selected:
+                state.folded[i] = 1
+        state.unfolded = selected
+
+    fold_visible_urls(view)
+
+
+def fold_visible_urls(view):
+    """
+    Fold not yet folded urls, which were scrolled into view.
+
+    It does nothing unless urls are folded by viewport, because the view contains
+    more urls than `mde.auto_fold_link.viewport_threshold`.
+
+    :param view:  The view
+    """
+    state = _url_foldings.get(view.id())
+    if state is None or state.folded is None:
+        return
+    if state.change_count != view.change_count():
+        fold_urls(view)
+        return
+
+    regions = url_regions(view)
+    folded = state.folded
+    urls = []
+    first, last = viewport_urls(view)
+    i = folded.find(0, first, last)
+    while i >= 0:
+        folded[i] = 1
+        if i not in state.unfolded:
+            urls.append(regions[i])
+        i = folded.find(0, i + 1, last)
+    if urls:
+        fold_regions(view, urls)
 
 
 def unfold_urls(view):
@@ -197,11 +522,10 @@ def unfold_urls(view):
 
     :param view:  The view
     """
-    folded_regions = view.folded_regions()
-    unfold_regions = [
-        url for url in url_regions(view) if any(url.contains(folded) for folded in folded_regions)
-    ]
-    view.unfold(unfold_regions)
+    _url_foldings.pop(view.id(), None)
+    folded = folded_regions(view)
+    if folded:
+        unfold_regions(view, [url for url in url_regions(view) if folded.contained(url)])
 
 
 class MdeFoldSectionCommand(MdeTextCommand):
@@ -225,15 +549,17 @@ class MdeFoldSectionCommand(MdeTextCommand):
     def is_enabled(self):
         view = self.view
         target_level = folding_target_level(view)
+        folded = folded_regions(view)
         for sel in view.sel():
             section, _ = section_region_and_level(view, sel.a, target_level)
             if section:
-                return not bool(folded_region(view, section))
+                return not folded.containing(section)
         return False
 
     def run(self, edit):
         view = self.view
         target_level = folding_target_level(view)
+        folded = folded_regions(view)
         sections = []
         for sel in view.sel():
             if any(s.contains(sel) for s in sections):
@@ -241,11 +567,12 @@ class MdeFoldSectionCommand(MdeTextCommand):
             section, _ = section_region_and_level(view, sel.begin(), target_level)
             if not section:
                 continue
-            folded_section = folded_region(view, section)
+            folded_section = folded.containing(section)
             if not folded_section:
                 sections.append(section)
 
-        view.fold(sections)
+        for v in shared_views(view):
+            fold_regions(v, sections)
 
         sublime.status_message(
             "{} region{} folded".format(len(sections), "s" if len(sections) > 1 else "")
@@ -273,15 +600,17 @@ class MdeUnfoldSectionCommand(MdeTextCommand):
     def is_enabled(self):
         view = self.view
         target_level = folding_target_level(view)
+        folded = folded_regions(view)
         for sel in view.sel():
             section, _ = section_region_and_level(view, sel.a, target_level)
             if section:
-                return bool(folded_region(view, section))
+                return bool(folded.containing(section))
         return False
 
     def run(self, edit):
         view = self.view
         target_level = folding_target_level(view)
+        folded = folded_regions(view)
         sections = []
         levels = []
         for sel in view.sel():
@@ -290,7 +619,7 @@ class MdeUnfoldSectionCommand(MdeTextCommand):
             section, level = section_region_and_level(view, sel.begin(), target_level)
             if not section:
                 continue
-            folded_section = folded_region(view, section)
+            folded_section = folded.containing(section)
             if folded_section:
                 if folded_section != section:
                     level = section_level(view, folded_section.begin())
@@ -308,8 +637,9 @@ class MdeUnfoldSectionCommand(MdeTextCommand):
             for section in sections:
                 regions_to_fold.extend(sections_to_fold(view, section, -1))
 
-        view.unfold(sections)
-        view.fold(regions_to_fold + urls_to_fold(view))
+        for v in shared_views(view):
+            unfold_regions(v, sections)
+            fold_regions(v, regions_to_fold + urls_to_fold(v))
 
         sublime.status_message(
             "{} region{} unfolded".format(len(sections), "s" if len(sections) > 1 else "")
@@ -342,10 +672,24 @@ class MdeFoldAllSectionsCommand(MdeTextCommand):
     def run(self, edit, target_level=0):
         view = self.view
         view_region = sublime.Region(0, view.size())
-        view.unfold(view_region)
         sections = list(sections_to_fold(view, view_region, target_level))
-        view.fold(sections + urls_to_fold(view))
-        view.settings().set("mde.folding.target_level", target_level)
+
+        target_sections = set()
+        for section in sections:
+            begin = max(0, section.begin())
+            if section.end() > begin:
+                target_sections.add((begin, section.end()))
+        # keep urls folded, which are not part of the target set due to viewport mode
+        urls = {(url.begin(), url.end()) for url in url_regions(view)}
+
+        for v in shared_views(view):
+            # only apply differences to current folds to avoid flicker and layout work
+            target = target_sections | {(url.begin(), url.end()) for url in urls_to_fold(v)}
+            folded = {(r.begin(), r.end()) for r in folded_regions(v).regions}
+            unfold_regions(v, [sublime.Region(*r) for r in sorted(folded - target - urls)])
+            fold_regions(v, [sublime.Region(*r) for r in sorted(target - folded)])
+            v.settings().set("mde.folding.target_level", target_level)
+
         show_first_unfolded_selection(view)
         sublime.status_message(
             "{} region{} folded".format(len(sections), "s" if len(sections) > 1 else "")
@@ -359,14 +703,92 @@ class MdeUnfoldAllSectionsCommand(MdeTextCommand):
 
     def run(self, edit):
         view = self.view
-        view.settings().erase("mde.folding.target_level")
-        view.unfold(sublime.Region(0, view.size()))
-        if view.settings().get("mde.auto_fold_link.enabled", True):
-            fold_urls(view)
+        for v in shared_views(view):
+            v.settings().erase("mde.folding.target_level")
+            unfold_regions(v, sublime.Region(0, v.size()))
+            if v.settings().get("mde.auto_fold_link.enabled", True):
+                fold_urls(v)
         show_first_unfolded_selection(view)
         sublime.status_message("all regions unfolded")
 
 
+BLOCK_KINDS = {
+    "fenced_code": frozenset((blocks.FENCE, blocks.CODE)),
+    "frontmatter": frozenset((blocks.FRONTMATTER,)),
+    # blank lines between list items don't end a list
+    "list": frozenset((blocks.LIST_ITEM, blocks.LIST_CONTINUATION, blocks.BLANK)),
+    "quote": frozenset((blocks.QUOTE,)),
+}
+
+
+def blocks_to_fold(index, kinds, min_lines):
+    """
+    Return foldable blocks of given kinds.
+
+    Blocks are the runs of consecutive lines of each kind's line kinds in a block index.
+    The first line of each block keeps visible. So do closing fences of fenced code blocks
+    and front matter.
+
+    :param index:      The `Blocks` of a view
+    :param kinds:      The collection of block kinds to fold
+                       (`"fenced_code"`, `"frontmatter"`, `"list"` or `"quote"`)
+    :param min_lines:  The number of lines a block must have to be folded
+
+    :returns:   A sorted list of regions to fold
+    """
+    line_kinds = index.kinds
+    regions = []
+    for kind in frozenset(kinds):
+        for first, last in index.runs(BLOCK_KINDS.get(kind, ())):
+            while first <= last and line_kinds[first] == blocks.BLANK:
+                first += 1
+            while last > first and line_kinds[last] == blocks.BLANK:
+                last -= 1
+            if first > last or last - first + 1 < min_lines:
+                continue
+            # keep closing fences visible
+            if last > first and line_kinds[last] in (blocks.FENCE, blocks.FRONTMATTER):
+                last -= 1
+            begin = index.line_region(first)[1]
+            end = index.line_region(last)[1]
+            if end > begin:
+                regions.append(sublime.Region(begin, end))
+
+    regions.sort(key=lambda r: r.begin())
+    return regions
+
+
+class MdeFoldAllBlocksCommand(MdeTextCommand):
+    """
+    This class describes a `mde_fold_all_blocks` command which folds blocks by kind.
+
+    Supported kinds are `"fenced_code"`, `"frontmatter"`, `"list"` and `"quote"`.
+    Blocks with less than `min_lines` lines keep unfolded.
+
+    Example:
+
+    ```json
+    { "command": "mde_fold_all_blocks", "args": {"kinds": ["fenced_code"], "min_lines": 20} }
+    ```
+    """
+
+    def run(self, edit, kinds=None, min_lines=None):
+        view = self.view
+        settings = view.settings()
+        if kinds is None:
+            kinds = settings.get("mde.folding.block_kinds", ["fenced_code", "frontmatter"])
+        if min_lines is None:
+            min_lines = settings.get("mde.folding.block_min_lines", 10)
+
+        regions = blocks_to_fold(block_index(model_view(view)), kinds, min_lines)
+        for v in shared_views(view):
+            fold_regions(v, regions)
+        show_first_unfolded_selection(view)
+        sublime.status_message(
+            "{} region{} folded".format(len(regions), "s" if len(regions) > 1 else "")
+        )
+
+
 class MdeFoldLinksCommand(MdeTextCommand):
     """
     This class describes a `mde_fold_links` command.
@@ -395,44 +817,283 @@ class MdeFoldLinksCommand(MdeTextCommand):
             unfold_urls(self.view)
 
 
+class FoldStateStore:
+    """
+    This class describes a persistent store of fold states of files.
+
+    Each file's folded regions, folding level and link folding mode are stored together with
+    a hash of its content, so they are restored only if the file didn't change meanwhile.
+    The most recently stored `MAX_FILES` files are kept.
+    """
+
+    MAX_FILES = 200
+    VERSION = 1
+
+    def __init__(self, cache_file):
+        self.cache_file = cache_file
+        self.files = None
+        self.lock = threading.Lock()
+
+    def load(self):
+        if self.files is None:
+            self.files = (
+                load_json_cache(self.cache_file, self.VERSION, object_pairs_hook=OrderedDict)
+                or OrderedDict()
+            )
+
+    def save(self):
+        try:
+            save_json_cache(self.cache_file, self.VERSION, self.files)
+        except OSError as e:
+            logger.error("Unable to save fold state: %s", e)
+
+    def get(self, path, content_hash):
+        """
+        Return the stored fold state of a file.
+
+        :param path:          The absolute path of the file
+        :param content_hash:  The hash of the file's current content
+
+        :returns:  The fold state dictionary or `None`, if unknown or the content changed
+        """
+        with self.lock:
+            self.load()
+            state = self.files.get(path)
+        if state and state["hash"] == content_hash:
+            return state
+        return None
+
+    def put(self, path, state):
+        """
+        Store the fold state of a file.
+
+        :param path:   The absolute path of the file
+        :param state:  The fold state dictionary
+        """
+        with self.lock:
+            self.load()
+            self.files.pop(path, None)
+            self.files[path] = state
+            while len(self.files) > self.MAX_FILES:
+                self.files.popitem(last=False)
+            self.save()
+
+
+_fold_state_store = None
+
+
+def fold_state_store():
+    global _fold_state_store
+    if _fold_state_store is None:
+        _fold_state_store = FoldStateStore(
+            os.path.join(sublime.cache_path(), package_name, "fold_state.json")
+        )
+    return _fold_state_store
+
+
+def content_hash(view):
+    text = view.substr(sublime.Region(0, view.size()))
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+def save_fold_state(view):
+    """
+    Store folded regions, folding level and link folding mode of a view's file.
+
+    Folded urls are not stored, as they are folded by automatic link folding.
+
+    :param view:  The view
+    """
+    path = view.file_name()
+    if not path or not view.settings().get("mde.folding.persist_state", True):
+        return
+    settings = view.settings()
+    urls = {(url.begin(), url.end()) for url in url_regions(view)}
+    state = {
+        "hash": content_hash(view),
+        "folds": [
+            [r.a, r.b] for r in folded_regions(view).regions if (r.begin(), r.end()) not in urls
+        ],
+        "target_level": settings.get("mde.folding.target_level"),
+        "fold_links": settings.get("mde.auto_fold_link.enabled", True),
+    }
+    sublime.set_timeout_async(lambda: fold_state_store().put(path, state))
+
+
+def restore_fold_state(view):
+    """
+    Restore folding level and link folding mode of a view's file,
+    if its content didn't change since they were stored.
+
+    Folded regions are returned to be folded by the caller.
+
+    :param view:  The view
+
+    :returns:  The list of stored folded regions or `None` if no fold state was restored
+    """
+    path = view.file_name()
+    if not path or not view.settings().get("mde.folding.persist_state", True):
+        return None
+    state = fold_state_store().get(path, content_hash(view))
+    if state is None:
+        return None
+
+    settings = view.settings()
+    if state["target_level"] is not None:
+        settings.set("mde.folding.target_level", state["target_level"])
+    if state["fold_links"] != settings.get("mde.auto_fold_link.enabled", True):
+        settings.set("mde.auto_fold_link.enabled", state["fold_links"])
+    return [sublime.Region(a, b) for a, b in state["folds"]]
+
+
+def fold_deferred(view, regions, change_count, chunk_size=1000):
+    """
+    Fold regions in background, visible ones first.
+
+    Regions within the visible region are folded at once, all others are folded in chunks
+    of `chunk_size` regions. Nothing is folded anymore, once the view is modified.
+
+    :param view:          The view
+    :param regions:       The list of regions to fold
+    :param change_count:  The view's change count `regions` were computed for
+    :param chunk_size:    The number of regions to fold at once
+    """
+    if view.change_count() != change_count:
+        return
+    visible = view.visible_region()
+    pending = []
+    visible_regions = []
+    for region in regions:
+        if region.end() >= visible.begin() and region.begin() <= visible.end():
+            visible_regions.append(region)
+        else:
+            pending.append(region)
+
+    if visible_regions:
+        fold_regions(view, visible_regions)
+
+    def fold_chunk(start):
+        if not view.is_valid() or view.change_count() != change_count:
+            return
+        end = start + chunk_size
+        fold_regions(view, pending[start:end])
+        if end < len(pending):
+            sublime.set_timeout_async(lambda: fold_chunk(end))
+
+    if pending:
+        sublime.set_timeout_async(lambda: fold_chunk(0))
+
+
 class MdeAutoFoldListener(MdeViewEventListener):
     """
-    This class describes an automatic link folding event listener.
+    This class describes an automatic section and link folding event listener.
+
+    Sections and links are folded in background after loading a file.
+
+    If urls are folded by viewport, the viewport is polled while the view is active
+    in order to fold urls, which are scrolled into view.
     """
 
-    def auto_fold_links(self):
+    POLL_INTERVAL = 500
+
+    adopted = False
+    polling = False
+    viewport_position = None
+
+    def auto_fold_sections(self):
+        view = self.view
+        level = view.settings().get("mde.auto_fold_sections.level", False)
+        if level is False or not 0 <= int(level) <= 6:
+            return []
+        view.settings().set("mde.folding.target_level", int(level))
+        return list(sections_to_fold(view, sublime.Region(0, view.size()), int(level)))
+
+    def auto_fold(self):
+        """
+        Restore fold state or fold sections and links in background.
+        """
+        view = self.view
+        if not view.is_valid():
+            return
+
+        change_count = view.change_count()
+        regions = restore_fold_state(view)
+        if regions is None:
+            regions = self.auto_fold_sections()
+
+        if view.settings().get("mde.auto_fold_link.enabled", True):
+            # links may have been folded meanwhile by activating the view
+            state = _url_foldings.get(view.id())
+            if state is None or state.change_count != view.change_count():
+                regions.extend(urls_to_fold(view))
+        else:
+            unfold_urls(view)
+
+        fold_deferred(view, regions, change_count)
+
+    def refold_links(self):
         if self.view.settings().get("mde.auto_fold_link.enabled", True):
-            fold_urls(self.view)
+            refold_urls(self.view)
+            self.watch_viewport()
         else:
             unfold_urls(self.view)
 
-    def auto_fold_sections(self):
-        level = self.view.settings().get("mde.auto_fold_sections.level", False)
-        if level is not False and 0 <= int(level) <= 6:
-            self.view.run_command("mde_fold_all_sections", {"target_level": level})
+    def watch_viewport(self):
+        if self.polling:
+            return
+
+        def poll():
+            view = self.view
+            window = view.window()
+            state = _url_foldings.get(view.id())
+            if not window or window.active_view() != view or state is None or state.folded is None:
+                self.polling = False
+                return
+
+            position = view.viewport_position()
+            if position != self.viewport_position:
+                self.viewport_position = position
+                fold_visible_urls(view)
+            sublime.set_timeout(poll, self.POLL_INTERVAL)
+
+        self.polling = True
+        poll()
 
     def on_init(self):
         """
         Fold all links after application startup.
         """
-        self.auto_fold_sections()
-        self.auto_fold_links()
+        sublime.set_timeout_async(self.auto_fold)
+
+    def on_load_async(self):
+        """
+        Restore fold state or fold all links once file is loaded.
+        """
+        self.auto_fold()
 
-    def on_load(self):
+    def on_pre_close(self):
         """
-        Fold all links once file is loaded.
+        Store fold state before file is closed.
         """
-        self.auto_fold_sections()
-        self.auto_fold_links()
+        save_fold_state(self.view)
 
     def on_activated(self):
         """
         Update link folding when activating view.
         """
-        self.auto_fold_links()
+        if not self.adopted:
+            self.adopted = True
+            adopt_folds(self.view)
+        self.refold_links()
 
     def on_selection_modified(self):
         """
         Update link folding when moving caret around.
         """
-        self.auto_fold_links()
+        self.refold_links()
+
+    def on_post_text_command(self, command_name, args):
+        """
+        Fold links scrolled into view by commands.
+        """
+        fold_visible_urls(self.view)
@@ -1,33 +1,105 @@
+import bisect
+import itertools
 import re
 
 import sublime
+import sublime_plugin
 
-from .view import MdeTextCommand, MdeViewEventListener
+from .view import MdeTextCommand, MdeViewEventListener, register_view_cache
 
 DEFINITION_KEY = "MarkdownEditing-footnote-definitions"
 REFERENCE_KEY = "MarkdownEditing-footnote-references"
+DIRTY_KEY = "MarkdownEditing-footnote-dirty"
 DEFINITION_REGEX = r"^[\t ]*\[\^([^\]]*)\]:"
 REFERENCE_REGEX = r"\[\^([^\]]*)\]"
 
+DEFINITION_RE = re.compile(DEFINITION_REGEX, re.M)
+REFERENCE_RE = re.compile(REFERENCE_REGEX)
+FOOTNOTE_END_RE = re.compile(r"(\s*\Z|\n\s*\n(?!\ {4,}))")
+
+
+class FootnoteIndex:
+    """
+    This class maps footnote ids to their marked definition and reference regions.
+
+    References located on definition lines are not considered references of a footnote.
+    All marked references are also stored as sorted arrays of offsets, so the reference
+    a caret is located within is found in O(log n).
+    """
+
+    __slots__ = ["change_count", "definitions", "references", "ref_begins", "ref_ends", "ref_ids"]
+
+    def __init__(self, view):
+        self.change_count = view.change_count()
+        self.definitions = {}
+        self.references = {}
+        self.ref_begins = []
+        self.ref_ends = []
+        self.ref_ids = []
+
+        text = view.substr(sublime.Region(0, view.size()))
+        def_begins = []
+        for defn in view.get_regions(DEFINITION_KEY):
+            def_begins.append(defn.begin())
+            self.definitions[text[defn.begin() : defn.end()].strip()[2:-2]] = defn
+
+        for ref in view.get_regions(REFERENCE_KEY):
+            id = text[ref.begin() + 2 : ref.end() - 1]
+            self.ref_begins.append(ref.begin())
+            self.ref_ends.append(ref.end())
+            self.ref_ids.append(id)
+            # skip references on definition lines
+            i = bisect.bisect_right(def_begins, ref.begin()) - 1
+            if i >= 0 and text.find("\n", def_begins[i], ref.begin()) < 0:
+                continue
+            self.references.setdefault(id, []).append(ref)
+
+    def reference_at(self, region):
+        """
+        Return the id of the marked footnote reference containing `region` or `None`.
+        """
+        i = bisect.bisect_right(self.ref_begins, region.begin()) - 1
+        if i >= 0 and region.end() <= self.ref_ends[i]:
+            return self.ref_ids[i]
+        return None
+
+    def reference_intersecting(self, region):
+        """
+        Return the id of the last marked footnote reference intersecting `region` or `None`.
+        """
+        i = bisect.bisect_left(self.ref_begins, region.end()) - 1
+        if i >= 0 and region.intersects(sublime.Region(self.ref_begins[i], self.ref_ends[i])):
+            return self.ref_ids[i]
+        return None
+
+
+_footnote_indexes = register_view_cache({})
+
+
+def footnote_index(view):
+    """
+    Return the cached footnote index of a view.
+
+    The index is rebuilt only if marked footnote regions were updated or moved.
+
+    :param view:  The view
+
+    :returns:  The `FootnoteIndex` of the view
+    """
+    index = _footnote_indexes.get(view.id())
+    if index is None or index.change_count != view.change_count():
+        flush_footnote_regions(view)
+        index = FootnoteIndex(view)
+        _footnote_indexes[view.id()] = index
+    return index
+
 
 def get_footnote_references(view):
-    ids = {}
-    for ref in view.get_regions(REFERENCE_KEY):
-        if not re.match(DEFINITION_REGEX, view.substr(view.line(ref))):
-            id = view.substr(ref)[2:-1]
-            if id in ids:
-                ids[id].append(ref)
-            else:
-                ids[id] = [ref]
-    return ids
+    return footnote_index(view).references
 
 
 def get_footnote_definition_markers(view):
-    ids = {}
-    for defn in view.get_regions(DEFINITION_KEY):
-        id = view.substr(defn).strip()[2:-2]
-        ids[id] = defn
-    return ids
+    return footnote_index(view).definitions
 
 
 def get_footnote_identifiers(view):
@@ -54,11 +126,7 @@ def is_footnote_definition(view):
 
 
 def is_footnote_reference(view):
-    refs = view.get_regions(REFERENCE_KEY)
-    for ref in refs:
-        if ref.contains(view.sel()[0]):
-            return True
-    return False
+    return footnote_index(view).reference_at(view.sel()[0]) is not None
 
 
 def strip_trailing_whitespace(view, edit):
@@ -67,20 +135,188 @@ def strip_trailing_whitespace(view, edit):
         view.erase(edit, tws)
 
 
+_scanned_views = register_view_cache({})
+
+
+def update_footnote_regions(view):
+    """
+    Mark all footnote references and definitions of a view.
+
+    :param view:  The view
+    """
+    view.erase_regions(DIRTY_KEY)
+    view.add_regions(REFERENCE_KEY, view.find_all(REFERENCE_REGEX), "", "cross", sublime.HIDDEN)
+    view.add_regions(DEFINITION_KEY, view.find_all(DEFINITION_REGEX), "", "cross", sublime.HIDDEN)
+    _scanned_views[view.id()] = view.change_count()
+    _footnote_indexes.pop(view.id(), None)
+
+
+def splice_regions(regions, lines, found):
+    """
+    Replace all regions touching modified lines by those found within them.
+
+    :param regions:  The sorted list of regions
+    :param lines:    The sorted list of non-overlapping modified line regions
+    :param found:    The sorted list of regions found within `lines`
+
+    :returns:  A sorted list of regions
+    """
+    result = []
+    i = 0
+    for line in lines:
+        while i < len(regions) and regions[i].end() <= line.begin():
+            result.append(regions[i])
+            i += 1
+        # lines are full lines, so a region beginning at `line.end()` is located on the next one
+        while i < len(regions) and regions[i].begin() < line.end():
+            i += 1
+    result.extend(regions[i:])
+    result.extend(found)
+    result.sort(key=lambda r: r.begin())
+    return [r for r in result if not r.empty()]
+
+
+def update_modified_footnote_regions(view):
+    """
+    Update marked footnote references and definitions of modified lines only.
+
+    Modified text regions are collected by `MdeFootnoteTracker` and shifted by ST
+    with further modifications until they are processed.
+
+    :param view:  The view
+    """
+    if view.id() not in _scanned_views:
+        update_footnote_regions(view)
+        return
+
+    dirty = view.get_regions(DIRTY_KEY)
+    view.erase_regions(DIRTY_KEY)
+    if not dirty:
+        return
+
+    lines = []
+    for region in sorted(dirty, key=lambda r: r.begin()):
+        line = view.full_line(region)
+        if lines and line.begin() <= lines[-1].end():
+            lines[-1] = lines[-1].cover(line)
+        else:
+            lines.append(line)
+
+    refs = []
+    defs = []
+    for line in lines:
+        text = view.substr(line)
+        offset = line.begin()
+        for m in REFERENCE_RE.finditer(text):
+            refs.append(sublime.Region(offset + m.start(), offset + m.end()))
+        for m in DEFINITION_RE.finditer(text):
+            defs.append(sublime.Region(offset + m.start(), offset + m.end()))
+
+    view.add_regions(
+        REFERENCE_KEY,
+        splice_regions(view.get_regions(REFERENCE_KEY), lines, refs),
+        "",
+        "cross",
+        sublime.HIDDEN,
+    )
+    view.add_regions(
+        DEFINITION_KEY,
+        splice_regions(view.get_regions(DEFINITION_KEY), lines, defs),
+        "",
+        "cross",
+        sublime.HIDDEN,
+    )
+    _scanned_views[view.id()] = view.change_count()
+    _footnote_indexes.pop(view.id(), None)
+
+
+def flush_footnote_regions(view):
+    """
+    Apply pending updates of marked footnotes, which are still waiting for their delay.
+
+    The whole view is scanned again, if it was modified without modifications being
+    tracked, e.g. because its syntax was assigned after its buffer was created.
+
+    :param view:  The view
+    """
+    if view.get_regions(DIRTY_KEY):
+        update_modified_footnote_regions(view)
+    if _scanned_views.get(view.id()) != view.change_count():
+        update_footnote_regions(view)
+
+
+def changed_regions(changes):
+    """
+    Calculate text regions modified by a list of text changes.
+
+    :param changes:  The list of `sublime.TextChange` objects in order of application
+
+    :returns:  A list of `(begin, end)` tuples in coordinates after all changes were applied
+    """
+    regions = []
+    for change in changes:
+        begin = change.a.pt
+        removed_end = change.b.pt
+        end = begin + len(change.str)
+        delta = end - removed_end
+        shifted = []
+        for a, b in regions:
+            if b < begin:
+                shifted.append((a, b))
+            elif a > removed_end:
+                shifted.append((a + delta, b + delta))
+            else:
+                begin = min(begin, a)
+                end = max(end, b + delta if b > removed_end else end)
+        shifted.append((begin, end))
+        regions = shifted
+    return regions
+
+
 class MdeMarkFootnotesListener(MdeViewEventListener):
-    def update_footnote_data(self):
-        self.view.add_regions(
-            REFERENCE_KEY, self.view.find_all(REFERENCE_REGEX), "", "cross", sublime.HIDDEN
-        )
-        self.view.add_regions(
-            DEFINITION_KEY, self.view.find_all(DEFINITION_REGEX), "", "cross", sublime.HIDDEN
-        )
+    """
+    This view event listener marks footnote references and definitions by hidden regions.
+
+    All footnotes are marked once a file is loaded. Afterwards only modified lines are
+    scanned again by `MdeFootnoteTracker`.
+    """
 
     def on_load(self):
-        self.update_footnote_data()
+        update_footnote_regions(self.view)
+
+
+class MdeFootnoteTracker(sublime_plugin.TextChangeListener):
+    """
+    This text change listener collects text regions modified since footnotes were marked
+    and updates marked footnotes of modified lines after modifications stopped for a moment.
+    """
+
+    DELAY = 300
+
+    @classmethod
+    def is_applicable(cls, buffer):
+        view = buffer.primary_view()
+        try:
+            return "Markdown" in view.settings().get("syntax")
+        except (AttributeError, TypeError):
+            return False
 
-    def on_modified_async(self):
-        self.update_footnote_data()
+    def on_text_changed(self, changes):
+        regions = changed_regions(changes)
+        views = self.buffer.views()
+        for view in views:
+            dirty = view.get_regions(DIRTY_KEY)
+            dirty.extend(view.full_line(sublime.Region(a, b)) for a, b in regions)
+            view.add_regions(DIRTY_KEY, dirty, "", "", sublime.HIDDEN)
+
+        change_count = views[0].change_count() if views else -1
+
+        def update():
+            for view in views:
+                if view.is_valid() and view.change_count() == change_count:
+                    update_modified_footnote_regions(view)
+
+        sublime.set_timeout_async(update, self.DELAY)
 
 
 class MdeGatherMissingFootnotesCommand(MdeTextCommand):
@@ -130,17 +366,12 @@ class MdeInsertFootnoteCommand(MdeTextCommand):
 
 class MdeGotoFootnoteDefinitionCommand(MdeTextCommand):
     def run(self, edit):
-        defs = get_footnote_definition_markers(self.view)
-        regions = self.view.get_regions(REFERENCE_KEY)
+        index = footnote_index(self.view)
+        defs = index.definitions
 
         sel = self.view.sel()
         if len(sel) == 1:
-            target = None
-            selreg = sel[0]
-
-            for region in regions:
-                if selreg.intersects(region):
-                    target = self.view.substr(region)[2:-1]
+            target = index.reference_intersecting(sel[0])
             if not target:
                 try:
                     target = self.view.substr(self.view.find(REFERENCE_REGEX, sel[-1].end()))[2:-1]
@@ -182,26 +413,98 @@ class MdeSwitchToFromFootnoteCommand(MdeTextCommand):
 
 
 class MdeSortFootnotesCommand(MdeTextCommand):
+    """
+    The `mde_sort_footnotes` command moves all footnote definitions to the end of the document
+    and sorts them by first occurrence of their ids.
+
+    Extents of all definitions are calculated from the document's text and the result
+    is applied by a single replacement.
+    """
+
     def run(self, edit):
-        strip_trailing_whitespace(self.view, edit)
-        defs = get_footnote_definition_markers(self.view)
+        view = self.view
+        index = footnote_index(view)
+        if not index.definitions:
+            strip_trailing_whitespace(view, edit)
+            return
+
+        text = view.substr(sublime.Region(0, view.size())).rstrip()
+
+        markers = sorted(index.definitions.items(), key=lambda item: item[1].begin())
         notes = {}
-        erase = []
-        keyorder = map(lambda x: self.view.substr(x)[2:-1], self.view.get_regions(REFERENCE_KEY))
-        keys = []
-        for r in keyorder:
-            if r not in keys:
-                keys.append(r)
-
-        for (key, item) in defs.items():
-            fnend = self.view.find(r"(\s*\Z|\n\s*\n(?!\ {4,}))", item.end())
-            fnreg = sublime.Region(item.begin(), fnend.end())
-            notes[key] = self.view.substr(fnreg).strip()
-            erase.append(fnreg)
-        erase.sort()
-        erase.reverse()
-        for reg in erase:
-            self.view.erase(edit, reg)
-
-        for key in keys:
-            self.view.insert(edit, self.view.size(), "\n\n " + notes[key])
+        parts = []
+        pos = markers[0][1].begin()
+        for i, (key, marker) in enumerate(markers):
+            end = FOOTNOTE_END_RE.search(text, marker.end()).end()
+            # a definition ends before the next one at latest
+            if i + 1 < len(markers):
+                end = min(end, markers[i + 1][1].begin())
+            parts.append(text[pos : marker.begin()])
+            notes[key] = text[marker.begin() : end].strip()
+            pos = end
+        parts.append(text[pos:])
+
+        keys = dict.fromkeys(
+            text[r.begin() + 2 : r.end() - 1] for r in view.get_regions(REFERENCE_KEY)
+        )
+        parts.extend("\n\n " + notes[key] for key in keys if key in notes)
+
+        view.replace(edit, sublime.Region(markers[0][1].begin(), view.size()), "".join(parts))
+
+
+class MdeRenumberFootnotesCommand(MdeTextCommand):
+    """
+    The `mde_renumber_footnotes` command renumbers footnotes as 1..N in order of
+    their first reference. Footnotes, which are defined but never referenced, follow
+    in order of their definitions.
+
+    Footnotes with non-numeric ids are left alone, unless `named` is `True`.
+
+    All references and definitions are updated by a single replacement.
+
+    Example:
+
+    ```json
+    { "command": "mde_renumber_footnotes", "args": {"named": true} }
+    ```
+    """
+
+    def run(self, edit, named=False):
+        view = self.view
+        index = footnote_index(view)
+
+        def defined_ids():
+            for key, _ in sorted(index.definitions.items(), key=lambda item: item[1].begin()):
+                yield key
+
+        mapping = {}
+        for key in itertools.chain(index.references, defined_ids()):
+            if key not in mapping and (named or key.isdigit()):
+                mapping[key] = str(len(mapping) + 1)
+
+        text = view.substr(sublime.Region(0, view.size()))
+        changes = []
+        for region in view.get_regions(REFERENCE_KEY):
+            key = text[region.begin() + 2 : region.end() - 1]
+            new_key = mapping.get(key)
+            if new_key is not None and new_key != key:
+                changes.append((region.begin() + 2, region.end() - 1, new_key))
+
+        if not changes:
+            sublime.status_message("Footnotes are already numbered")
+            return
+
+        begin = changes[0][0]
+        end = changes[-1][1]
+        parts = []
+        pos = begin
+        for a, b, new_key in changes:
+            parts.append(text[pos:a])
+            parts.append(new_key)
+            pos = b
+        parts.append(text[pos:end])
+        view.replace(edit, sublime.Region(begin, end), "".join(parts))
+
+        sublime.status_message(
+            "{} footnote{} renumbered".format(len(mapping), "s" if len(mapping) > 1 else "")
+        )
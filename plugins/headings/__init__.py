@@ -1,5 +1,13 @@
+from .anchors import *
+from .breadcrumb import *
 from .common import *
 from .goto import *
+from .index import *
 from .level import *
+from .links import *
+from .move import *
+from .project import *
+from .statistics import *
 from .style import *
+from .toc import *
 from .underlined import *
@@ -0,0 +1,122 @@
+import re
+import sublime
+
+from .index import add_outline_listener, heading_index
+from ..view import MdeViewEventListener, register_view_cache
+
+ANCHOR_LINK_RE = re.compile(r"\]\([ \t]*<?#([^)\s>]*)(?=[ \t>)])")
+ANCHOR_PREFIX_RE = re.compile(r"\]\([ \t]*<?#([^)\s>]*)$")
+UNRESOLVED_ANCHORS_KEY = "MarkdownEditing-unresolved-anchors"
+
+
+class AnchorIndex:
+    """
+    This class maps GitHub-style anchor slugs to the number of their heading.
+
+    The heading number is used to look up current position and title of a heading
+    via `heading_index()`, so an anchor index stays valid until the outline changes.
+    """
+
+    __slots__ = ["slugs"]
+
+    def __init__(self, index):
+        self.slugs = {slug: i for i, slug in enumerate(index.slugs)}
+
+    def __contains__(self, slug):
+        return slug in self.slugs
+
+    def get(self, slug):
+        return self.slugs.get(slug)
+
+
+_anchor_indexes = register_view_cache({})
+
+
+@add_outline_listener
+def _on_outline_changed(view, events):
+    _anchor_indexes.pop(view.id(), None)
+
+
+def anchor_index(view):
+    """
+    Return the cached anchor index of a view.
+
+    The index is rebuilt only if headings were added, removed or renamed.
+
+    :param view:  The view
+
+    :returns:  The `AnchorIndex` of the view
+    """
+    # outline change events drop outdated anchor indexes
+    index = heading_index(view)
+    anchors = _anchor_indexes.get(view.id())
+    if anchors is None:
+        anchors = AnchorIndex(index)
+        _anchor_indexes[view.id()] = anchors
+    return anchors
+
+
+def unresolved_anchors(view):
+    """
+    Find all in-document anchor links, which don't point to an existing heading.
+
+    :param view:  The view
+
+    :returns:  A list of regions of unresolved anchor names
+    """
+    anchors = anchor_index(view)
+    text = view.substr(sublime.Region(0, view.size()))
+    regions = []
+    for m in ANCHOR_LINK_RE.finditer(text):
+        slug = m.group(1)
+        if slug and slug not in anchors and view.match_selector(m.start(1), "- markup.raw"):
+            regions.append(sublime.Region(m.start(1), m.end(1)))
+    return regions
+
+
+class MdeAnchorListener(MdeViewEventListener):
+    """
+    This view event listener completes anchor names of headings within `[text](#...)` links
+    and underlines unresolved anchor links, if `mde.validate_anchors` is enabled.
+    """
+
+    DELAY = 500
+
+    def on_query_completions(self, _, locations):
+        pt = locations[0]
+        prefix = self.view.substr(sublime.Region(self.view.line(pt).begin(), pt))
+        if not ANCHOR_PREFIX_RE.search(prefix):
+            return None
+
+        index = heading_index(self.view)
+        completions = [
+            [slug + "\t" + "#" * level + " " + title, slug]
+            for slug, level, title in zip(index.slugs, index.levels, index.titles)
+        ]
+        return (
+            completions,
+            sublime.INHIBIT_WORD_COMPLETIONS | sublime.INHIBIT_EXPLICIT_COMPLETIONS,
+        )
+
+    def on_load_async(self):
+        self.validate_anchors(self.view.change_count())
+
+    def on_modified_async(self):
+        change_count = self.view.change_count()
+        sublime.set_timeout_async(lambda: self.validate_anchors(change_count), self.DELAY)
+
+    def validate_anchors(self, change_count):
+        view = self.view
+        if not view.settings().get("mde.validate_anchors", False):
+            view.erase_regions(UNRESOLVED_ANCHORS_KEY)
+            return
+        # skip outdated requests while typing
+        if view.change_count() != change_count:
+            return
+        view.add_regions(
+            UNRESOLVED_ANCHORS_KEY,
+            unresolved_anchors(view),
+            "invalid",
+            "",
+            sublime.DRAW_NO_FILL | sublime.DRAW_NO_OUTLINE | sublime.DRAW_SQUIGGLY_UNDERLINE,
+        )
@@ -0,0 +1,70 @@
+import sublime
+
+from .index import heading_index
+from ..view import MdeViewEventListener
+
+BREADCRUMB_KEY = "mde.breadcrumb"
+BREADCRUMB_SEPARATOR = " › "
+
+
+class MdeBreadcrumbListener(MdeViewEventListener):
+    """
+    This view event listener displays the path of headings of the section
+    the caret is located in, if `mde.breadcrumb.enabled` is `true`.
+
+    The status bar is updated only if the caret moves into another section
+    or headings are added, removed or renamed. While typing, the heading index
+    is not rebuilt before modifications stopped for a moment.
+    """
+
+    DELAY = 300
+
+    current = None
+    change_count = -1
+
+    def on_activated_async(self):
+        self.current = None
+        self.update_breadcrumb()
+
+    def on_selection_modified_async(self):
+        view = self.view
+        change_count = view.change_count()
+        if change_count == self.change_count or not view.settings().get(
+            "mde.breadcrumb.enabled", False
+        ):
+            self.update_breadcrumb()
+            return
+
+        def update():
+            if view.is_valid() and view.change_count() == change_count:
+                self.update_breadcrumb()
+
+        sublime.set_timeout_async(update, self.DELAY)
+
+    def update_breadcrumb(self):
+        view = self.view
+        if not view.settings().get("mde.breadcrumb.enabled", False):
+            if self.current is not None:
+                self.current = None
+                view.erase_status(BREADCRUMB_KEY)
+            return
+
+        sel = view.sel()
+        if not sel:
+            return
+
+        index = heading_index(view)
+        self.change_count = index.change_count
+        heading = index.heading_at(sel[0].b)
+        current = (heading, index.fingerprint)
+        if current == self.current:
+            return
+
+        self.current = current
+        if heading < 0:
+            view.erase_status(BREADCRUMB_KEY)
+        else:
+            titles = index.titles
+            view.set_status(
+                BREADCRUMB_KEY, BREADCRUMB_SEPARATOR.join(titles[i] for i in index.path(heading))
+            )
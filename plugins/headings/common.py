@@ -15,6 +15,45 @@ HEADINGS_RE = re.compile(
 )
 
 
+CLOSING_HASHES_RE = re.compile(r"[ \t]+#+[ \t]*$")
+
+
+def heading_level_and_title(m):
+    """
+    Return level and title of a heading matched by `HEADINGS_RE`.
+
+    :param m:  The match object
+
+    :returns:  A `(level, title)` tuple with closing hashes and whitespace stripped from title
+    """
+    if m.group(2):
+        # ATX headings use group 2 (leading hashes) and 3 (text)
+        return (m.end(2) - m.start(2), CLOSING_HASHES_RE.sub("", m.group(3)).strip())
+    # SETEXT headings use group 4 (text) and 5 (underlines)
+    return (2 if m.group(5)[0] == "-" else 1, m.group(4).strip())
+
+
+def parse_headings(text, ignore):
+    """
+    Generate all headings of a markdown text.
+
+    :param text:    The text to parse
+    :param ignore:  A function, which returns `True` for text positions to ignore headings at
+
+    :yields:  `(match, row, level, title)` tuples
+    """
+    row = 0
+    last = 0
+    for m in HEADINGS_RE.finditer(text):
+        begin = m.start()
+        if ignore(begin):
+            continue
+        level, title = heading_level_and_title(m)
+        row += text.count("\n", last, begin)
+        last = begin
+        yield (m, row, level, title)
+
+
 def all_headings(view, start=0, end=None):
     if end is None:
         end = view.size()
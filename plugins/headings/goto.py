@@ -1,6 +1,7 @@
 import sublime
 
 from .common import all_headings
+from .index import heading_index
 from ..view import MdeTextCommand
 
 
@@ -65,3 +66,66 @@ class MdeGotoPreviousHeadingCommand(MdeTextCommand):
         view.sel().clear()
         view.sel().add_all(new_sel)
         view.show(new_sel[-1])
+
+
+def outline_items(index):
+    """
+    Create the items of the outline quick panel.
+
+    :param index:  The `HeadingIndex` of the view
+
+    :returns:  A list of `(trigger, annotation)` tuples, one for each heading.
+    """
+    subtree_ends = index.subtree_ends
+    return [
+        (
+            "    " * (level - 1) + title,
+            "line {}, {} subheadings".format(row + 1, subtree_ends[i] - i - 1),
+        )
+        for i, (row, level, title) in enumerate(zip(index.rows, index.levels, index.titles))
+    ]
+
+
+class MdeShowOutlineCommand(MdeTextCommand):
+    """
+    The `mde_show_outline` command lists all headings, indented by level, in a quick panel.
+
+    Items are annotated by line number and number of child headings.
+    The highlighted heading is previewed, cancelling the panel restores the former viewport.
+    """
+
+    def run(self, edit):
+        view = self.view
+        window = view.window()
+        if not window:
+            return
+
+        index = heading_index(view)
+        if not len(index):
+            sublime.status_message("No heading can be found")
+            return
+
+        items = [
+            sublime.QuickPanelItem(trigger, annotation=annotation)
+            for trigger, annotation in outline_items(index)
+        ]
+        viewport = view.viewport_position()
+        sel = view.sel()
+        selected = index.heading_at(sel[0].begin()) if len(sel) else -1
+
+        def heading_region(i):
+            return sublime.Region(index.begins[i], index.ends[i])
+
+        def on_highlight(i):
+            view.show(heading_region(i))
+
+        def on_done(i):
+            if i < 0:
+                view.set_viewport_position(viewport, False)
+                return
+            region = heading_region(i)
+            sel.clear()
+            sel.add(region)
+            view.show(region)
+
+        window.show_quick_panel(items, on_done, 0, max(0, selected), on_highlight)
@@ -0,0 +1,335 @@
+import bisect
+import difflib
+import re
+import sublime
+
+from collections import namedtuple
+
+from .common import parse_headings
+from ..logging import logger
+from ..view import register_view_cache
+
+SLUG_LINK_RE = re.compile(r"!?\[([^\]]*)\](?:\([^)]*\)|\[[^\]]*\])")
+SLUG_STRIP_RE = re.compile(r"<[^>]*>|[^\w\- ]")
+
+
+def slugify(title):
+    """
+    Convert a heading title into a GitHub-style anchor slug.
+
+    Link urls, html tags and punctuation are removed,
+    text is lower-cased and spaces are replaced by dashes.
+
+    :param title:  The heading title
+
+    :returns:  The anchor slug
+    """
+    title = SLUG_LINK_RE.sub(r"\1", title)
+    title = SLUG_STRIP_RE.sub("", title.strip().lower())
+    return title.replace(" ", "-")
+
+
+def unique_slugs(titles):
+    """
+    Generate unique anchor slugs for a list of heading titles.
+
+    Duplicate slugs are suffixed by `-1`, `-2`, ... in order of appearance.
+
+    :param titles:  An iterable of heading titles
+
+    :returns:  A list of unique anchor slugs
+    """
+    counts = {}
+    slugs = []
+    for title in titles:
+        slug = slugify(title)
+        count = counts.get(slug)
+        if count is None:
+            counts[slug] = 0
+            unique = slug
+        else:
+            while True:
+                count += 1
+                unique = "{}-{}".format(slug, count)
+                if unique not in counts:
+                    break
+            counts[slug] = count
+            counts[unique] = 0
+        slugs.append(unique)
+    return slugs
+
+
+class HeadingIndex:
+    """
+    This class describes the outline of a view.
+
+    It holds parallel lists of all headings' regions, levels and titles,
+    which are created by a single pass over the view's content.
+    Front matter and raw code blocks are ignored.
+    """
+
+    __slots__ = [
+        "change_count",
+        "begins",
+        "ends",
+        "levels",
+        "titles",
+        "rows",
+        "_fingerprint",
+        "_parents",
+        "_slugs",
+        "_subtree_ends",
+    ]
+
+    def __init__(self, view):
+        self.change_count = view.change_count()
+        self.begins = []
+        self.ends = []
+        self.levels = []
+        self.titles = []
+        self.rows = []
+        self._fingerprint = None
+        self._parents = None
+        self._slugs = None
+        self._subtree_ends = None
+
+        text = view.substr(sublime.Region(0, view.size()))
+
+        def ignore(pt):
+            # ignore front matter and raw code blocks
+            return not view.match_selector(pt, "- markup.raw")
+
+        for m, row, level, title in parse_headings(text, ignore):
+            self.begins.append(m.start())
+            self.ends.append(m.end())
+            self.levels.append(level)
+            self.titles.append(title)
+            self.rows.append(row)
+
+    def __len__(self):
+        return len(self.begins)
+
+    def __iter__(self):
+        """
+        Iterate headings as `(begin, end, level)` tuples like `all_headings()` does.
+        """
+        return zip(self.begins, self.ends, self.levels)
+
+    @property
+    def fingerprint(self):
+        """
+        A hash of all headings' levels and titles.
+
+        It changes only if the outline changes, but not if body text is modified.
+        """
+        if self._fingerprint is None:
+            self._fingerprint = hash((tuple(self.levels), tuple(self.titles)))
+        return self._fingerprint
+
+    @property
+    def parents(self):
+        """
+        A list of each heading's parent heading number or `-1` for top-level headings.
+        """
+        if self._parents is None:
+            parents = []
+            stack = []
+            for i, level in enumerate(self.levels):
+                while stack and self.levels[stack[-1]] >= level:
+                    stack.pop()
+                parents.append(stack[-1] if stack else -1)
+                stack.append(i)
+            self._parents = parents
+        return self._parents
+
+    @property
+    def subtree_ends(self):
+        """
+        A list of the numbers of the headings each heading's subtree ends before.
+
+        The subtree of heading `i` consists of headings `i` to `subtree_ends[i] - 1`.
+        """
+        if self._subtree_ends is None:
+            levels = self.levels
+            subtree_ends = [len(levels)] * len(levels)
+            stack = []
+            for i, level in enumerate(levels):
+                while stack and levels[stack[-1]] >= level:
+                    subtree_ends[stack.pop()] = i
+                stack.append(i)
+            self._subtree_ends = subtree_ends
+        return self._subtree_ends
+
+    def heading_at(self, pt):
+        """
+        Return the number of the heading whose section `pt` is located in.
+
+        :param pt:  The text position
+
+        :returns:  The heading number or `-1` if `pt` is located before first heading
+        """
+        return bisect.bisect_right(self.begins, pt) - 1
+
+    def path(self, i):
+        """
+        Return the numbers of a heading and all its ancestors, outermost first.
+
+        :param i:  The heading number
+
+        :returns:  A list of heading numbers
+        """
+        path = []
+        parents = self.parents
+        while i >= 0:
+            path.append(i)
+            i = parents[i]
+        path.reverse()
+        return path
+
+    @property
+    def slugs(self):
+        """
+        A list of unique GitHub-style anchor slugs of all headings.
+        """
+        if self._slugs is None:
+            self._slugs = unique_slugs(self.titles)
+        return self._slugs
+
+
+HEADING_ADDED = "added"
+HEADING_REMOVED = "removed"
+HEADING_RENAMED = "renamed"
+HEADING_LEVEL_CHANGED = "level_changed"
+
+OutlineEvent = namedtuple("OutlineEvent", ["kind", "heading", "begin", "level", "title"])
+OutlineEvent.__doc__ = """
+An outline modification.
+
+`heading` is the number of the affected heading and `begin` its text position
+in the new index or, for removed headings, in the old index.
+"""
+
+
+def outline_events(old, new):
+    """
+    Compare the outlines of two heading indexes.
+
+    :param old:  The previous `HeadingIndex`
+    :param new:  The current `HeadingIndex`
+
+    :returns:  A list of `OutlineEvent`s, which is empty if the outline didn't change
+    """
+    if old.fingerprint == new.fingerprint:
+        return []
+
+    old_items = list(zip(old.levels, old.titles))
+    new_items = list(zip(new.levels, new.titles))
+
+    # strip common head and tail, as edits usually touch a few headings only
+    head = 0
+    max_head = min(len(old_items), len(new_items))
+    while head < max_head and old_items[head] == new_items[head]:
+        head += 1
+    tail = 0
+    max_tail = max_head - head
+    while tail < max_tail and old_items[-1 - tail] == new_items[-1 - tail]:
+        tail += 1
+
+    def added(j):
+        return OutlineEvent(HEADING_ADDED, j, new.begins[j], new.levels[j], new.titles[j])
+
+    def removed(i):
+        return OutlineEvent(HEADING_REMOVED, i, old.begins[i], old.levels[i], old.titles[i])
+
+    events = []
+    matcher = difflib.SequenceMatcher(
+        None,
+        old_items[head : len(old_items) - tail],
+        new_items[head : len(new_items) - tail],
+        False,
+    )
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        i1, i2, j1, j2 = i1 + head, i2 + head, j1 + head, j2 + head
+        if tag == "replace":
+            # pairwise modified headings are renamed or changed level
+            for i, j in zip(range(i1, i2), range(j1, j2)):
+                if old.titles[i] == new.titles[j]:
+                    kind = HEADING_LEVEL_CHANGED
+                elif old.levels[i] == new.levels[j]:
+                    kind = HEADING_RENAMED
+                else:
+                    events.append(removed(i))
+                    events.append(added(j))
+                    continue
+                events.append(OutlineEvent(kind, j, new.begins[j], new.levels[j], new.titles[j]))
+            events.extend(removed(i) for i in range(i1 + j2 - j1, i2))
+            events.extend(added(j) for j in range(j1 + i2 - i1, j2))
+        elif tag == "delete":
+            events.extend(removed(i) for i in range(i1, i2))
+        elif tag == "insert":
+            events.extend(added(j) for j in range(j1, j2))
+    return events
+
+
+_outline_listeners = []
+
+
+def add_outline_listener(callback):
+    """
+    Subscribe to outline modifications.
+
+    The `callback(view, events)` is called with a list of `OutlineEvent`s,
+    whenever a view's heading index is updated and headings were added, removed,
+    renamed or changed level. It is not called if only body text was modified.
+
+    :param callback:  The function to call
+
+    :returns:  The callback
+    """
+    if callback not in _outline_listeners:
+        _outline_listeners.append(callback)
+    return callback
+
+
+def remove_outline_listener(callback):
+    """
+    Unsubscribe from outline modifications.
+
+    :param callback:  The function passed to `add_outline_listener()`
+    """
+    try:
+        _outline_listeners.remove(callback)
+    except ValueError:
+        pass
+
+
+_heading_indexes = register_view_cache({})
+
+
+def heading_index(view):
+    """
+    Return the cached heading index of a view.
+
+    The index is rebuilt only if the view's content changed since it was created.
+    Subscribers of `add_outline_listener()` are notified if headings changed.
+
+    :param view:  The view
+
+    :returns:  The `HeadingIndex` of the view
+    """
+    old_index = _heading_indexes.get(view.id())
+    if old_index is not None and old_index.change_count == view.change_count():
+        return old_index
+
+    index = HeadingIndex(view)
+    _heading_indexes[view.id()] = index
+
+    if old_index is not None and _outline_listeners:
+        events = outline_events(old_index, index)
+        if events:
+            for callback in tuple(_outline_listeners):
+                try:
+                    callback(view, events)
+                except Exception as e:
+                    logger.error("Outline listener failed: %s", e)
+    return index
@@ -0,0 +1,252 @@
+import os
+import re
+import threading
+
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from urllib.parse import unquote
+
+import sublime
+import sublime_plugin
+
+from .anchors import anchor_index
+from .index import unique_slugs
+from .project import RawBlocks, index_settings, markdown_files, text_headings
+from ..view import MdeTextCommand
+
+LINK_TARGET_RE = re.compile(r"\]\([ \t]*<?([^)\s>#:]*)(?:#([^)\s>]*))?(?=[ \t>)])")
+PANEL_NAME = "mde"
+
+
+class SlugCache:
+    """
+    This class caches anchor slugs of markdown files by their modification time.
+
+    Files are read only when their anchors are looked up for the first time
+    or after they have been modified.
+    """
+
+    def __init__(self):
+        self.files = {}
+        self.lock = threading.Lock()
+
+    def slugs(self, path):
+        """
+        Return the set of anchor slugs of a file.
+
+        :param path:  The absolute path of the file
+
+        :returns:  A set of slugs or `None`, if the file doesn't exist
+        """
+        try:
+            mtime = os.stat(path).st_mtime
+        except OSError:
+            return None
+
+        with self.lock:
+            entry = self.files.get(path)
+        if entry and entry[0] == mtime:
+            return entry[1]
+
+        try:
+            with open(path, encoding="utf-8", errors="replace") as f:
+                headings = text_headings(f.read())
+        except OSError:
+            return None
+
+        slugs = frozenset(unique_slugs(title for _, _, title in headings))
+        with self.lock:
+            self.files[path] = (mtime, slugs)
+        return slugs
+
+
+_slug_cache = SlugCache()
+
+
+def open_views():
+    """
+    Return a dictionary of all views with a file name by their file name.
+    """
+    return {
+        view.file_name(): view
+        for window in sublime.windows()
+        for view in window.views()
+        if view.file_name()
+    }
+
+
+def slug_lookup(views):
+    """
+    Create a function returning anchor slugs of a file.
+
+    Slugs of files opened in `views` are taken from their anchor index,
+    to respect unsaved modifications. All other files are read lazily.
+
+    :param views:  A dictionary of open views by file name
+
+    :returns:  A function taking an absolute path and returning a set of slugs or `None`
+    """
+
+    def lookup(path):
+        view = views.get(path)
+        if view and view.is_valid():
+            return anchor_index(view)
+        return _slug_cache.slugs(path)
+
+    return lookup
+
+
+def broken_links(text, path, lookup, extensions):
+    """
+    Find links to not existing markdown files or anchors.
+
+    Absolute paths and urls are ignored.
+
+    :param text:        The text to check links of
+    :param path:        The absolute path of the file `text` belongs to
+    :param lookup:      The function to return anchor slugs of a file
+    :param extensions:  The list of file extensions of markdown files
+
+    :yields:  `(row, col, message)` tuples
+    """
+    base_dir = os.path.dirname(path)
+    raw_blocks = RawBlocks(text)
+    row = 0
+    last = 0
+    for m in LINK_TARGET_RE.finditer(text):
+        target, anchor = m.groups()
+        if target:
+            if target.startswith("/") or os.path.splitext(target)[1].lower() not in extensions:
+                continue
+            target_path = os.path.normpath(os.path.join(base_dir, unquote(target)))
+        elif anchor:
+            target_path = path
+        else:
+            continue
+
+        begin = m.start(1)
+        if begin in raw_blocks:
+            continue
+
+        slugs = lookup(target_path)
+        if slugs is None:
+            message = "missing file '{}'".format(target)
+        elif anchor and unquote(anchor) not in slugs:
+            message = "missing anchor '#{}' in '{}'".format(anchor, target or "this file")
+        else:
+            continue
+
+        row += text.count("\n", last, begin)
+        last = begin
+        col = begin - text.rfind("\n", 0, begin) - 1
+        yield (row, col, message)
+
+
+def create_results_panel(window, base_dir=""):
+    panel = window.create_output_panel(PANEL_NAME)
+    settings = panel.settings()
+    settings.set("result_file_regex", r"^(.+?):(\d+):(\d+): ")
+    settings.set("result_base_dir", base_dir)
+    settings.set("word_wrap", False)
+    window.run_command("show_panel", {"panel": "output." + PANEL_NAME})
+    return panel
+
+
+def append_results(panel, path, results):
+    text = "".join(
+        "{}:{}:{}: {}\n".format(path, row + 1, col + 1, message) for row, col, message in results
+    )
+    if text:
+        panel.run_command("append", {"characters": text, "force": True, "scroll_to_end": True})
+
+
+class MdeValidateLinksCommand(MdeTextCommand):
+    """
+    The `mde_validate_links` command reports links of the current file
+    pointing to not existing markdown files or anchors.
+    """
+
+    def is_enabled(self):
+        return super().is_enabled() and bool(self.view.file_name())
+
+    def run(self, edit):
+        view = self.view
+        window = view.window()
+        path = view.file_name()
+        text = view.substr(sublime.Region(0, view.size()))
+        extensions, _ = index_settings(window)
+        views = open_views()
+        views[path] = view
+
+        def worker():
+            results = list(broken_links(text, path, slug_lookup(views), extensions))
+
+            def show():
+                if results:
+                    panel = create_results_panel(window)
+                    append_results(panel, path, results)
+                    sublime.status_message("{} broken link(s) found".format(len(results)))
+                else:
+                    window.destroy_output_panel(PANEL_NAME)
+                    sublime.status_message("No broken links found")
+
+            sublime.set_timeout(show)
+
+        sublime.set_timeout_async(worker)
+
+
+class MdeValidateProjectLinksCommand(sublime_plugin.WindowCommand):
+    """
+    The `mde_validate_project_links` command reports links of all markdown files
+    of the current project pointing to not existing markdown files or anchors.
+
+    Files are checked by a pool of threads and results are streamed to an output panel.
+    """
+
+    MAX_WORKERS = 4
+
+    def is_enabled(self):
+        return bool(self.window.folders())
+
+    def run(self):
+        window = self.window
+        folders = window.folders()
+        extensions, exclude_patterns = index_settings(window)
+        views = open_views()
+        lookup = slug_lookup(views)
+        # check open files with unsaved modifications like their anchors are looked up
+        texts = {
+            path: view.substr(sublime.Region(0, view.size()))
+            for path, view in views.items()
+            if os.path.splitext(path)[1].lower() in extensions
+        }
+        panel = create_results_panel(window, folders[0])
+
+        def check(path):
+            text = texts.get(path)
+            if text is None:
+                try:
+                    with open(path, encoding="utf-8", errors="replace") as f:
+                        text = f.read()
+                except OSError:
+                    return (path, [])
+            return (path, list(broken_links(text, path, lookup, extensions)))
+
+        def worker():
+            num_broken = 0
+            with ThreadPoolExecutor(max_workers=self.MAX_WORKERS) as executor:
+                futures = [
+                    executor.submit(check, path)
+                    for path in markdown_files(folders, extensions, exclude_patterns)
+                ]
+                for future in as_completed(futures):
+                    path, results = future.result()
+                    if results:
+                        num_broken += len(results)
+                        sublime.set_timeout(lambda p=path, r=results: append_results(panel, p, r))
+
+            sublime.set_timeout(
+                lambda: sublime.status_message("{} broken link(s) found".format(num_broken))
+            )
+
+        sublime.status_message("Validating links...")
+        sublime.set_timeout_async(worker)
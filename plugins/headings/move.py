@@ -0,0 +1,157 @@
+import sublime
+
+from .index import heading_index
+from ..view import MdeTextCommand
+
+
+def section_bounds(index, pt, size):
+    """
+    Find the section `pt` is located in and the bounds of its siblings.
+
+    A section begins at the first character of its heading line and ends at the beginning
+    of the next heading with same or higher level or at end of document.
+
+    :param index:  The `HeadingIndex` of the view
+    :param pt:     The text position to find the section for
+    :param size:   The size of the view
+
+    :returns:
+        A tuple of `(prev, this, next)` section regions. `prev` and `next` are `None`,
+        if current section has no such sibling. `this` is `None` if `pt` is not located
+        within any section.
+    """
+    i = index.heading_at(pt)
+    if i < 0:
+        return (None, None, None)
+
+    begins = index.begins
+    levels = index.levels
+    subtree_ends = index.subtree_ends
+
+    def section_end(i):
+        end = subtree_ends[i]
+        return begins[end] if end < len(begins) else size
+
+    level = levels[i]
+    this = sublime.Region(begins[i], section_end(i))
+
+    # walk up ancestors of the preceding heading to the nearest one of same or higher level
+    prev = None
+    j = i - 1
+    while j >= 0 and levels[j] > level:
+        j = index.parents[j]
+    if j >= 0 and levels[j] == level:
+        prev = sublime.Region(begins[j], this.begin())
+
+    next = None
+    j = subtree_ends[i]
+    if j < len(begins) and levels[j] == level:
+        next = sublime.Region(begins[j], section_end(j))
+
+    return (prev, this, next)
+
+
+def split_trailing_blank_lines(text):
+    """
+    Split blank lines off the end of a section's text.
+
+    :param text:  The text of a section
+
+    :returns:  A tuple of `(body, blank)`, with `blank` being all lines after the last non-blank one.
+    """
+    end = text.find("\n", len(text.rstrip()))
+    if end < 0:
+        return (text, "")
+    return (text[: end + 1], text[end + 1 :])
+
+
+def swap_sections(view, edit, first, second):
+    """
+    Swap two adjacent sections by a single replacement.
+
+    Blank lines at the end of each section stay in place, so the separator
+    between both sections and the document's tail are not moved.
+
+    :param view:    The view
+    :param edit:    The edit token
+    :param first:   The region of the upper section
+    :param second:  The region of the lower section, which must begin at `first.end()`
+
+    :returns:  A tuple of offsets the content of `first` and `second` was moved by.
+    """
+    upper, upper_blank = split_trailing_blank_lines(view.substr(first))
+    lower, lower_blank = split_trailing_blank_lines(view.substr(second))
+    # last section of document may not be terminated by newline
+    if not lower.endswith("\n"):
+        lower += "\n"
+        if upper.endswith("\n"):
+            upper = upper[:-1]
+    view.replace(
+        edit,
+        sublime.Region(first.begin(), second.end()),
+        lower + upper_blank + upper + lower_blank,
+    )
+    return (len(lower) + len(upper_blank), first.begin() - second.begin())
+
+
+class MdeMoveSectionCommand(MdeTextCommand):
+    """
+    This is the base class of section moving commands.
+
+    The section the first caret is located in is swapped with its previous or next sibling
+    by replacing both of them at once. Child sections are moved along with their parent.
+    """
+
+    def description(self):
+        # Used as the name for Undo.
+        return "Move Section"
+
+    def run(self, edit, forward):
+        view = self.view
+        sel = view.sel()
+        if not sel:
+            return
+
+        pt = sel[0].begin()
+        prev, this, next = section_bounds(heading_index(view), pt, view.size())
+        if this is None:
+            sublime.status_message("No section found to move")
+            return
+
+        if forward:
+            if next is None:
+                sublime.status_message("Section has no next sibling")
+                return
+            offset, _ = swap_sections(view, edit, this, next)
+        else:
+            if prev is None:
+                sublime.status_message("Section has no previous sibling")
+                return
+            _, offset = swap_sections(view, edit, prev, this)
+
+        regions = [sublime.Region(s.a + offset, s.b + offset) for s in sel if this.contains(s)]
+        if not regions:
+            regions = [sublime.Region(pt + offset)]
+        sel.clear()
+        sel.add_all(regions)
+        view.show(regions[0])
+
+
+class MdeMoveSectionUpCommand(MdeMoveSectionCommand):
+    """
+    The `mde_move_section_up` command swaps the current section,
+    including all its child sections, with its previous sibling.
+    """
+
+    def run(self, edit):
+        super().run(edit, forward=False)
+
+
+class MdeMoveSectionDownCommand(MdeMoveSectionCommand):
+    """
+    The `mde_move_section_down` command swaps the current section,
+    including all its child sections, with its next sibling.
+    """
+
+    def run(self, edit):
+        super().run(edit, forward=True)
@@ -0,0 +1,269 @@
+import fnmatch
+import os
+import re
+import threading
+
+import sublime
+import sublime_plugin
+
+from .common import parse_headings
+from ..core.intervals import Intervals
+from ..core.json_cache import load_json_cache, save_json_cache
+from ..logging import logger
+
+package_name = __package__.split(".")[0]
+
+CACHE_VERSION = 1
+DEFAULT_EXTENSIONS = [".md", ".mdown", ".markdown", ".markdn"]
+
+RAW_BLOCKS_RE = re.compile(
+    r"""
+      \A---[ \t]*\n .*? ^(?:---|\.\.\.)[ \t]*$                 # front matter
+    | ^[ \t]*(`{3,}|~{3,}) .*? (?: ^[ \t]*\1[ \t]*$ | \Z )     # fenced code blocks
+    """,
+    re.M | re.S | re.X,
+)
+
+
+class RawBlocks(Intervals):
+    """
+    This class describes the sorted ranges of front matter and fenced code blocks of a text.
+
+    It is used to ignore markup within raw blocks without relying on syntax highlighting.
+    """
+
+    __slots__ = []
+
+    def __init__(self, text):
+        super().__init__(m.span() for m in RAW_BLOCKS_RE.finditer(text))
+
+
+def text_headings(text):
+    """
+    Parse headings of a markdown document's text without relying on syntax highlighting.
+
+    Headings within front matter or fenced code blocks are ignored.
+
+    :param text:  The text to parse
+
+    :returns:  A list of `[row, level, title]` lists
+    """
+    raw_blocks = RawBlocks(text)
+    return [
+        [row, level, title]
+        for _, row, level, title in parse_headings(text, raw_blocks.__contains__)
+    ]
+
+
+def markdown_files(folders, extensions, exclude_patterns):
+    """
+    Generate paths of all markdown files within `folders`.
+
+    :param folders:           The list of folders to scan
+    :param extensions:        The list of file extensions of markdown files
+    :param exclude_patterns:  The list of folder name patterns to skip
+
+    :yields:  The absolute path of each markdown file
+    """
+    for folder in folders:
+        for dirname, dirnames, files in os.walk(folder):
+            dirnames[:] = [
+                d for d in dirnames if not any(fnmatch.fnmatch(d, p) for p in exclude_patterns)
+            ]
+            for file in files:
+                if os.path.splitext(file)[1].lower() in extensions:
+                    yield os.path.join(dirname, file)
+
+
+class ProjectHeadingIndex:
+    """
+    This class describes a persistent index of headings of all markdown files of a project.
+
+    The index maps each file's path to its modification time, size and list of headings.
+    It is stored in ST's cache directory and only files, whose modification time or size
+    changed, are parsed again when refreshing the index.
+    """
+
+    def __init__(self, cache_file):
+        self.cache_file = cache_file
+        self.files = None
+        self.dirty = False
+        self.lock = threading.Lock()
+
+    def load(self):
+        if self.files is None:
+            self.files = load_json_cache(self.cache_file, CACHE_VERSION) or {}
+
+    def save(self):
+        if not self.dirty:
+            return
+        try:
+            save_json_cache(self.cache_file, CACHE_VERSION, self.files)
+            self.dirty = False
+        except OSError as e:
+            logger.error("Unable to save heading index: %s", e)
+
+    def update_file(self, path, stat=None):
+        """
+        Parse headings of a file, if it changed since last time.
+
+        :param path:  The absolute path of the file
+        :param stat:  The file's `os.stat_result`, if already known
+
+        :returns:  `True` if the file was parsed
+        """
+        try:
+            if stat is None:
+                stat = os.stat(path)
+            entry = self.files.get(path)
+            if entry and entry[0] == stat.st_mtime and entry[1] == stat.st_size:
+                return False
+            with open(path, encoding="utf-8", errors="replace") as f:
+                headings = text_headings(f.read())
+        except OSError:
+            if self.files.pop(path, None) is not None:
+                self.dirty = True
+            return False
+
+        self.files[path] = [stat.st_mtime, stat.st_size, headings]
+        self.dirty = True
+        return True
+
+    def refresh(self, folders, extensions, exclude_patterns):
+        """
+        Update the index with all markdown files found in `folders`.
+
+        :param folders:           The list of folders to scan
+        :param extensions:        The list of file extensions to index
+        :param exclude_patterns:  The list of folder name patterns to skip
+        """
+        with self.lock:
+            self.load()
+            found = set()
+            num_parsed = 0
+            for path in markdown_files(folders, extensions, exclude_patterns):
+                found.add(path)
+                if self.update_file(path):
+                    num_parsed += 1
+
+            # drop deleted files
+            prefixes = tuple(os.path.join(f, "") for f in folders)
+            for path in [p for p in self.files if p.startswith(prefixes) and p not in found]:
+                del self.files[path]
+                self.dirty = True
+
+            logger.debug("Heading index: parsed %d of %d files", num_parsed, len(found))
+            self.save()
+
+    def headings(self, folders):
+        """
+        Generate all indexed headings of files within `folders`.
+
+        :yields:  `(path, row, level, title)` tuples
+        """
+        with self.lock:
+            self.load()
+            prefixes = tuple(os.path.join(f, "") for f in folders)
+            for path, (_, _, headings) in sorted(self.files.items()):
+                if path.startswith(prefixes):
+                    for row, level, title in headings:
+                        yield (path, row, level, title)
+
+
+_project_heading_index = None
+
+
+def project_heading_index():
+    global _project_heading_index
+    if _project_heading_index is None:
+        _project_heading_index = ProjectHeadingIndex(
+            os.path.join(sublime.cache_path(), package_name, "heading_index.json")
+        )
+    return _project_heading_index
+
+
+def index_settings(window):
+    view = window.active_view()
+    settings = view.settings() if view else sublime.load_settings("Preferences.sublime-settings")
+    extensions = [
+        e.lower() for e in settings.get("mde.heading_index.extensions", DEFAULT_EXTENSIONS)
+    ]
+    exclude_patterns = settings.get("folder_exclude_patterns", [])
+    return (extensions, exclude_patterns)
+
+
+class MdeGotoProjectHeadingCommand(sublime_plugin.WindowCommand):
+    """
+    The `mde_goto_project_heading` command lists headings of all markdown files
+    of the current project in a quick panel and opens the selected file at the heading.
+
+    The persistent heading index is refreshed in background before the panel is shown.
+    """
+
+    def is_enabled(self):
+        return bool(self.window.folders())
+
+    def run(self):
+        folders = self.window.folders()
+        extensions, exclude_patterns = index_settings(self.window)
+
+        def worker():
+            index = project_heading_index()
+            index.refresh(folders, extensions, exclude_patterns)
+            headings = list(index.headings(folders))
+            sublime.set_timeout(lambda: self.show_panel(folders, headings))
+
+        sublime.status_message("Indexing headings...")
+        sublime.set_timeout_async(worker)
+
+    def show_panel(self, folders, headings):
+        if not headings:
+            sublime.status_message("No headings found")
+            return
+
+        def relpath(path):
+            for folder in folders:
+                if path.startswith(os.path.join(folder, "")):
+                    return os.path.relpath(path, folder)
+            return path
+
+        items = [
+            ["#" * level + " " + title, "{}:{}".format(relpath(path), row + 1)]
+            for path, row, level, title in headings
+        ]
+
+        def on_done(index):
+            if index >= 0:
+                path, row, _, _ = headings[index]
+                self.window.open_file("{}:{}:{}".format(path, row + 1, 1), sublime.ENCODED_POSITION)
+
+        self.window.show_quick_panel(items, on_done)
+
+
+class MdeProjectHeadingIndexer(sublime_plugin.EventListener):
+    """
+    This event listener keeps the persistent heading index of saved files up to date.
+    """
+
+    def on_post_save_async(self, view):
+        window = view.window()
+        path = view.file_name()
+        if not window or not path:
+            return
+        # files outside of project folders are never looked up or pruned
+        if not path.startswith(tuple(os.path.join(f, "") for f in window.folders())):
+            return
+        extensions, _ = index_settings(window)
+        if os.path.splitext(path)[1].lower() not in extensions:
+            return
+        index = project_heading_index()
+        with index.lock:
+            index.load()
+            if index.update_file(path):
+                index.save()
+
+    def on_load_project_async(self, window):
+        folders = window.folders()
+        if folders:
+            extensions, exclude_patterns = index_settings(window)
+            project_heading_index().refresh(folders, extensions, exclude_patterns)
@@ -0,0 +1,122 @@
+import re
+import sublime
+
+from .index import heading_index
+from ..view import MdeTextCommand, register_view_cache
+
+WORD_RE = re.compile(r"\w+(?:['’-]\w+)*")
+
+
+class SectionStatistics:
+    """
+    This class describes word counts of all sections of a view.
+
+    Each section's own word count covers its heading and the text up to the next heading
+    of any level. Word counts are cached by a hash of the section's text, so only sections
+    which were modified since last time are counted again.
+
+    Subtree word counts, which include all child sections, are calculated from
+    prefix sums of own word counts.
+    """
+
+    __slots__ = ["change_count", "counts", "prefix_sums", "subtree_ends", "_cache"]
+
+    def __init__(self):
+        self.change_count = -1
+        self.counts = []
+        self.prefix_sums = [0]
+        self.subtree_ends = []
+        self._cache = {}
+
+    def update(self, view):
+        if self.change_count == view.change_count():
+            return
+
+        index = heading_index(view)
+        text = view.substr(sublime.Region(0, view.size()))
+        bounds = index.begins + [len(text)]
+
+        cache = {}
+        counts = []
+        for i in range(len(index)):
+            key = hash(text[bounds[i] : bounds[i + 1]])
+            count = self._cache.get(key)
+            if count is None:
+                count = len(WORD_RE.findall(text, bounds[i], bounds[i + 1]))
+            cache[key] = count
+            counts.append(count)
+
+        prefix_sums = [0]
+        for count in counts:
+            prefix_sums.append(prefix_sums[-1] + count)
+
+        self.change_count = view.change_count()
+        self.counts = counts
+        self.prefix_sums = prefix_sums
+        self.subtree_ends = index.subtree_ends
+        self._cache = cache
+
+    def subtree_count(self, i):
+        return self.prefix_sums[self.subtree_ends[i]] - self.prefix_sums[i]
+
+
+_section_statistics = register_view_cache({})
+
+
+def section_statistics(view):
+    """
+    Return the up-to-date section statistics of a view.
+
+    :param view:  The view
+
+    :returns:  The `SectionStatistics` of the view
+    """
+    stats = _section_statistics.get(view.id())
+    if stats is None:
+        stats = _section_statistics[view.id()] = SectionStatistics()
+    stats.update(view)
+    return stats
+
+
+class MdeShowSectionStatisticsCommand(MdeTextCommand):
+    """
+    The `mde_show_section_statistics` command lists all sections with their own word count,
+    the word count including all child sections and estimated reading time in a quick panel.
+
+    Reading time is based on `mde.statistics.words_per_minute` setting.
+    """
+
+    def run(self, edit):
+        view = self.view
+        window = view.window()
+        if not window:
+            return
+
+        index = heading_index(view)
+        if not len(index):
+            sublime.status_message("No heading can be found")
+            return
+
+        stats = section_statistics(view)
+        words_per_minute = max(1, view.settings().get("mde.statistics.words_per_minute", 200))
+
+        items = []
+        for i, (level, title) in enumerate(zip(index.levels, index.titles)):
+            subtree = stats.subtree_count(i)
+            items.append(
+                [
+                    "    " * (level - 1) + title,
+                    "{} words, {} with subsections, ~{} min".format(
+                        stats.counts[i], subtree, -(-subtree // words_per_minute)
+                    ),
+                ]
+            )
+
+        def on_done(i):
+            if i >= 0:
+                region = sublime.Region(index.begins[i], index.ends[i])
+                view.sel().clear()
+                view.sel().add(region)
+                view.show(region)
+
+        window.show_quick_panel(items, on_done)
@@ -0,0 +1,120 @@
+import difflib
+import re
+import sublime
+
+from .index import SLUG_LINK_RE, heading_index
+from ..view import MdeTextCommand, MdeViewEventListener
+
+TOC_BEGIN = "<!-- TOC -->"
+TOC_END = "<!-- /TOC -->"
+TOC_RE = re.compile(r"^<!-- TOC -->[ \t]*\n((?:.*\n)*?)<!-- /TOC -->", re.M)
+
+
+def toc_lines(view, max_level=6):
+    """
+    Generate the lines of a table of contents from a view's heading index.
+
+    :param view:       The view
+    :param max_level:  The maximum level of headings to add
+
+    :returns:  A list of list items linking to headings' anchors
+    """
+    index = heading_index(view)
+    entries = [
+        (level, title, slug)
+        for level, title, slug in zip(index.levels, index.titles, index.slugs)
+        if level <= max_level
+    ]
+    if not entries:
+        return []
+
+    settings = view.settings()
+    if settings.get("translate_tabs_to_spaces", False):
+        indent = " " * settings.get("tab_size", 4)
+    else:
+        indent = "\t"
+
+    min_level = min(entry[0] for entry in entries)
+    return [
+        "{}- [{}](#{})".format(indent * (level - min_level), SLUG_LINK_RE.sub(r"\1", title), slug)
+        for level, title, slug in entries
+    ]
+
+
+def update_lines(view, edit, begin, old_text, new_lines):
+    """
+    Replace only those lines of `old_text`, which differ from `new_lines`.
+
+    :param view:       The view
+    :param edit:       The edit token
+    :param begin:      The text position `old_text` begins at
+    :param old_text:   The current newline terminated content
+    :param new_lines:  The list of lines to replace content with
+
+    :returns:  The number of replaced chunks
+    """
+    old_lines = old_text.splitlines(True)
+    offsets = [begin]
+    for line in old_lines:
+        offsets.append(offsets[-1] + len(line))
+
+    new_lines = [line + "\n" for line in new_lines]
+    opcodes = [
+        opcode
+        for opcode in difflib.SequenceMatcher(None, old_lines, new_lines, False).get_opcodes()
+        if opcode[0] != "equal"
+    ]
+    # apply from bottom to top to keep offsets of preceding lines valid
+    for _, i1, i2, j1, j2 in reversed(opcodes):
+        view.replace(edit, sublime.Region(offsets[i1], offsets[i2]), "".join(new_lines[j1:j2]))
+    return len(opcodes)
+
+
+class MdeUpdateTocCommand(MdeTextCommand):
+    """
+    The `mde_update_toc` command creates or updates a table of contents.
+
+    The table of contents is placed between `<!-- TOC -->` and `<!-- /TOC -->` markers.
+    If no such block exists, a new one is inserted at the first caret position,
+    unless `insert` is `false`.
+
+    ```json
+    { "command": "mde_update_toc", "args": {"insert": true} }
+    ```
+    """
+
+    def description(self):
+        # Used as the name for Undo.
+        return "Update Table of Contents"
+
+    def run(self, edit, insert=True):
+        view = self.view
+        lines = toc_lines(view, view.settings().get("mde.toc.max_level", 6))
+
+        text = view.substr(sublime.Region(0, view.size()))
+        match = TOC_RE.search(text)
+        if match:
+            update_lines(view, edit, match.start(1), match.group(1), lines)
+        elif insert and len(view.sel()):
+            pt = view.line(view.sel()[0].begin()).begin()
+            view.insert(edit, pt, "\n".join([TOC_BEGIN] + lines + [TOC_END, ""]))
+
+
+class MdeTocUpdater(MdeViewEventListener):
+    """
+    This view event listener updates existing tables of contents before saving,
+    if `mde.toc.update_on_save` is enabled.
+
+    Nothing is done as long as the outline's fingerprint doesn't change.
+    """
+
+    fingerprint = None
+
+    def on_pre_save(self):
+        if not self.view.settings().get("mde.toc.update_on_save", False):
+            return
+
+        fingerprint = heading_index(self.view).fingerprint
+        if fingerprint != self.fingerprint:
+            self.view.run_command("mde_update_toc", {"insert": False})
+            self.fingerprint = fingerprint
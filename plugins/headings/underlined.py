@@ -1,8 +1,10 @@
-import itertools
+import bisect
 import re
 import sublime
 
-from ..view import MdeTextCommand
+from ..view import MdeTextCommand, SelectorIndex
+
+RAW_BLOCK_SELECTOR = "markup.raw, meta.frontmatter"
 
 SETEXT_DASHES_RE = re.compile(
     r"""
@@ -91,6 +93,78 @@ class MdeCompleteUnderlinedHeadingsCommand(MdeTextCommand):
                 fix_dashes(self.view, edit, text_line, dashes_line)
 
 
+def setext_heading_edits(text, regions, raw_blocks, convert=False, closed=False):
+    """
+    Calculate the edits to normalize all setext headings within `regions` in one pass.
+
+    :param text:        The whole text of a view
+    :param regions:     The sorted list of non-overlapping regions to look for headings in
+    :param raw_blocks:  The index of raw blocks to ignore headings within
+    :param convert:     If `True` headings are converted to atx format,
+                        otherwise their underlines are resized to match the header text
+    :param closed:      If `True` converted atx headings get closing hashes
+
+    :returns:  A sorted list of `(begin, end, replacement)` tuples
+    """
+    edits = []
+    for region in regions:
+        for m in SETEXT_HEADER_RE.finditer(text, region.begin(), region.end()):
+            if m.start() in raw_blocks:
+                continue
+            header, underline = m.groups()
+            if convert:
+                atx = "#" if "=" in underline else "##"
+                closing = " " + atx if closed else ""
+                edits.append((m.start(), m.end(), atx + " " + header + closing))
+            elif header.strip():
+                # Ignore dashes not under text. They are HRs.
+                new_underline = underline[0] * len(header)
+                if text[m.start(2) : m.end()] != new_underline:
+                    edits.append((m.start(2), m.end(), new_underline))
+    return edits
+
+
+def apply_edits(view, edit, text, edits):
+    """
+    Apply a sorted list of non-overlapping edits by a single replacement.
+
+    Selections are moved according to the edits applied before them.
+
+    :param view:   The view
+    :param edit:   The edit token
+    :param text:   The whole text of the view
+    :param edits:  The sorted list of `(begin, end, replacement)` tuples
+    """
+    if not edits:
+        return
+
+    begins = []
+    deltas = [0]
+    chunks = []
+    pos = edits[0][0]
+    for begin, end, replacement in edits:
+        begins.append(begin)
+        deltas.append(deltas[-1] + len(replacement) - (end - begin))
+        chunks.append(text[pos:begin])
+        chunks.append(replacement)
+        pos = end
+
+    def map_point(pt):
+        i = bisect.bisect_right(begins, pt) - 1
+        if i < 0:
+            return pt
+        begin, end, replacement = edits[i]
+        if pt < end:
+            return begin + deltas[i] + min(pt - begin, len(replacement))
+        return pt + deltas[i + 1]
+
+    sels = view.sel()
+    regions = [sublime.Region(map_point(sel.a), map_point(sel.b)) for sel in sels]
+    view.replace(edit, sublime.Region(edits[0][0], pos), "".join(chunks))
+    sels.clear()
+    sels.add_all(regions)
+
+
 class MdeConvertUnderlinedHeadingsToAtxCommand(MdeTextCommand):
     """
     The `mde_convert_underlined_headings` command searches for all setext headings
@@ -98,21 +172,15 @@ class MdeConvertUnderlinedHeadingsToAtxCommand(MdeTextCommand):
     """
 
     def run(self, edit, closed=False):
-        regions = list(self.view.sel())
+        view = self.view
+        regions = list(view.sel())
         if len(regions) == 1 and regions[0].size() == 0:
-            regions = [sublime.Region(0, self.view.size())]
-        regions.reverse()
-        for region in regions:
-            txt = self.view.substr(region)
-            matches = list(SETEXT_HEADER_RE.finditer(txt))
-            matches.reverse()
-            for m in matches:
-                mreg = sublime.Region(region.begin() + m.start(), region.begin() + m.end())
-                atx = "# "
-                if "-" in m.group(2):
-                    atx = "#" + atx
-                closing = atx[::-1] if closed else ""
-                self.view.replace(edit, mreg, atx + m.group(1) + closing)
+            regions = [sublime.Region(0, view.size())]
+
+        text = view.substr(sublime.Region(0, view.size()))
+        raw_blocks = SelectorIndex(view, RAW_BLOCK_SELECTOR)
+        edits = setext_heading_edits(text, regions, raw_blocks, convert=True, closed=closed)
+        apply_edits(view, edit, text, edits)
 
 
 class MdeFixUnderlinedHeadingsCommand(MdeTextCommand):
@@ -126,22 +194,8 @@ class MdeFixUnderlinedHeadingsCommand(MdeTextCommand):
         return "Fix Underlined Markdown Headings"
 
     def run(self, edit):
-        lines = self.view.split_by_newlines(sublime.Region(0, self.view.size()))
-        if len(lines) < 2:
-            return
-
-        # Since we're modifying the text, we are shifting all the following
-        # regions. To avoid this, just go backwards.
-        lines = reversed(lines)
-
-        # Duplicate the iterator and next() it once to get farther ahead.
-        # Since lines are reversed, this will always point to the line *above*
-        # the current one: the text of the header.
-        prev_lines, lines = itertools.tee(lines)
-        next(prev_lines)
-
-        for text_line, dashes_line in zip(prev_lines, lines):
-            dashes_text = self.view.substr(dashes_line)
-            m = SETEXT_DASHES_RE.match(dashes_text)
-            if m:
-                fix_dashes(self.view, edit, text_line, dashes_line)
+        view = self.view
+        text = view.substr(sublime.Region(0, view.size()))
+        raw_blocks = SelectorIndex(view, RAW_BLOCK_SELECTOR)
+        edits = setext_heading_edits(text, [sublime.Region(0, len(text))], raw_blocks)
+        apply_edits(view, edit, text, edits)
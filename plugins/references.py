@@ -22,6 +22,7 @@ import urllib.parse
 
 from .view import MdeTextCommand
 from .view import MdeViewEventListener
+from .view import find_by_selector
 
 refname_scope_name = "entity.name.reference.link.markdown"
 definition_scope_name = "meta.link.reference.def.markdown"
@@ -96,7 +97,7 @@ def getReferences2(view):
     pattern = re.compile(r"\[(.+)\]:\s+(?:<([^>]+)>|(\S+))", re.MULTILINE)
 
     ret = {}
-    for definition_line in view.find_by_selector(definition_scope_name):
+    for definition_line in find_by_selector(view, definition_scope_name):
         for reference_def in pattern.finditer(view.substr(definition_line)):
             name, angled_link, unquoted_link = reference_def.groups()
             assert not ret.get(name)
@@ -1,7 +1,13 @@
 import re
+import threading
 import sublime
 import sublime_plugin
 
+from collections import OrderedDict
+
+from .core.blocks import scan
+from .core.intervals import Intervals
+
 
 def view_is_markdown(view):
     try:
@@ -109,10 +115,155 @@ class MdeCenteredLineKeeper(MdeViewEventListener):
             self.view.show_at_center(pt)
 
 
+class RegionCache:
+    """
+    This class describes a bounded LRU cache of regions matching selectors in views.
+
+    Entries are keyed by view id and selector and are valid as long as the view's
+    change count doesn't change, so switching between views doesn't query regions again.
+    The least recently used entries are dropped, once `max_entries` is exceeded.
+
+    The cache is used from main and async threads, so all access is synchronized.
+    """
+
+    def __init__(self, max_entries=32):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def _entry(self, view, selector):
+        key = (view.id(), selector)
+        change_count = view.change_count()
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None or entry[0] != change_count:
+                entry = [change_count, view.find_by_selector(selector), None]
+                self.entries[key] = entry
+            # refreshed entries keep their position, so move them explicitly
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+        return entry
+
+    def find_by_selector(self, view, selector):
+        """
+        Return the cached list of regions matching a selector.
+
+        The list is shared and must not be modified.
+
+        :param view:      The view
+        :param selector:  The selector to match
+
+        :returns:  A sorted list of regions
+        """
+        return self._entry(view, selector)[1]
+
+    def begins(self, view, selector):
+        """
+        Return the cached list of begins of the regions matching a selector.
+
+        :param view:      The view
+        :param selector:  The selector to match
+
+        :returns:  A sorted list of text positions
+        """
+        entry = self._entry(view, selector)
+        if entry[2] is None:
+            entry[2] = [r.begin() for r in entry[1]]
+        return entry[2]
+
+    def pop(self, view_id, default=None):
+        """
+        Drop all entries of a view.
+
+        :param view_id:  The id of the view
+        :param default:  Ignored, it makes the cache compatible with `register_view_cache()`
+        """
+        with self.lock:
+            for key in [key for key in self.entries if key[0] == view_id]:
+                del self.entries[key]
+
+
+_view_caches = []
+
+
+def register_view_cache(cache):
+    """
+    Register per-view data, which is to be dropped once a view is closed.
+
+    :param cache:  A dictionary keyed by view id or any object providing `pop(view_id, default)`
+
+    :returns:  The registered cache
+    """
+    _view_caches.append(cache)
+    return cache
+
+
+class MdeViewCacheListener(MdeViewEventListener):
+    """
+    This view event listener drops all registered per-view caches of a view once it is closed.
+    """
+
+    def on_close(self):
+        view_id = self.view.id()
+        for cache in _view_caches:
+            cache.pop(view_id, None)
+
+
+region_cache = register_view_cache(RegionCache())
+
+
+def find_by_selector(view, selector):
+    """
+    Return the regions matching a selector from the shared region cache.
+
+    :param view:      The view
+    :param selector:  The selector to match
+
+    :returns:  A sorted list of regions, which must not be modified
+    """
+    return region_cache.find_by_selector(view, selector)
+
+
+_block_indexes = register_view_cache({})
+
+
+def block_index(view):
+    """
+    Return the cached block structure of a view.
+
+    The view's content is scanned again only if it changed since last time.
+
+    :param view:  The view
+
+    :returns:  The `Blocks` of the view
+    """
+    change_count = view.change_count()
+    entry = _block_indexes.get(view.id())
+    if entry is None or entry[0] != change_count:
+        entry = (change_count, scan(view.substr(sublime.Region(0, view.size()))))
+        _block_indexes[view.id()] = entry
+    return entry[1]
+
+
 def find_by_selector_in_regions(view, regions, selector):
     selectors = []
-    for sel in view.find_by_selector(selector):
+    for sel in find_by_selector(view, selector):
         if any(s.intersects(sel) for s in regions):
             selectors.append(sel)
 
     return selectors
+
+
+class SelectorIndex(Intervals):
+    """
+    This class describes the sorted regions of a view matching a selector.
+
+    It answers whether a text position is located within any of them in O(log n),
+    instead of calling `view.match_selector()` for each position.
+    """
+
+    __slots__ = []
+
+    def __init__(self, view, selector):
+        super().__init__((r.begin(), r.end()) for r in find_by_selector(view, selector))
@@ -0,0 +1,52 @@
+from MarkdownEditing.tests import DereferrablePanelTestCase
+
+from MarkdownEditing.plugins.headings import anchor_index, unresolved_anchors
+
+
+class TestAnchorIndex(DereferrablePanelTestCase):
+
+    def test_anchor_index(self):
+        self.setBlockText(
+            """
+            # Heading
+
+            ## Heading
+
+            ## Other *Heading*
+            """
+        )
+        anchors = anchor_index(self.view)
+        self.assertEqual(anchors.get("heading"), 0)
+        self.assertEqual(anchors.get("heading-1"), 1)
+        self.assertEqual(anchors.get("other-heading"), 2)
+        self.assertIsNone(anchors.get("heading-2"))
+
+    def test_anchor_index_survives_body_modifications(self):
+        self.setBlockText(
+            """
+            # Heading
+
+            text
+            """
+        )
+        anchors = anchor_index(self.view)
+        self.setCaretTo(3, 5)
+        self.view.run_command("insert", {"characters": " more text"})
+        self.assertIs(anchor_index(self.view), anchors)
+
+    def test_unresolved_anchors(self):
+        self.setBlockText(
+            """
+            # Heading
+
+            [valid](#heading) and [invalid](#missing)
+
+            ```
+            [raw](#ignored)
+            ```
+            """
+        )
+        self.assertEqual(
+            [self.view.substr(r) for r in unresolved_anchors(self.view)],
+            ["missing"]
+        )
@@ -0,0 +1,118 @@
+from textwrap import dedent
+from unittest import TestCase
+
+from MarkdownEditing.plugins.core import blocks
+
+
+class TestBlockScanner(TestCase):
+
+    def assertKinds(self, text, expected):
+        result = blocks.scan(dedent(text).strip("\n"))
+        self.assertEqual(
+            [(blocks.KIND_NAMES[kind], level) for kind, level in zip(result.kinds, result.levels)],
+            expected
+        )
+
+    def test_frontmatter_and_headings(self):
+        self.assertKinds(
+            """
+            ---
+            title: test
+            ---
+            # Heading 1
+
+            Heading 2
+            ---------
+            ## Heading 3 ##
+            """,
+            [
+                ("frontmatter", 0),
+                ("frontmatter", 0),
+                ("frontmatter", 0),
+                ("heading", 1),
+                ("blank", 0),
+                ("heading", 2),
+                ("underline", 0),
+                ("heading", 2),
+            ]
+        )
+
+    def test_fenced_code_blocks(self):
+        self.assertKinds(
+            """
+            ````
+            # no heading
+            ```
+            ````
+            ~~~
+            code
+            ~~~
+            """,
+            [
+                ("fence", 1),
+                ("code", 0),
+                ("code", 0),
+                ("fence", 0),
+                ("fence", 1),
+                ("code", 0),
+                ("fence", 0),
+            ]
+        )
+
+    def test_lists_and_quotes(self):
+        self.assertKinds(
+            """
+            * item
+              continued
+            lazy
+
+                indented
+            1. item
+            > quote
+            > > nested
+            lazy
+            """,
+            [
+                ("list_item", 0),
+                ("list_continuation", 0),
+                ("list_continuation", 0),
+                ("blank", 0),
+                ("list_continuation", 0),
+                ("list_item", 0),
+                ("quote", 1),
+                ("quote", 2),
+                ("quote", 2),
+            ]
+        )
+
+    def test_definitions_and_tables(self):
+        self.assertKinds(
+            """
+            [ref]: https://foo.bar
+            [^1]: footnote
+
+            a | b
+            --|--
+            1 | 2
+
+            ***
+            """,
+            [
+                ("reference", 0),
+                ("footnote", 0),
+                ("blank", 0),
+                ("table", 0),
+                ("table", 0),
+                ("table", 0),
+                ("blank", 0),
+                ("hr", 0),
+            ]
+        )
+
+    def test_runs_and_regions(self):
+        text = "```\na\n```\n```\nb\n```\n\ntext"
+        result = blocks.scan(text)
+        self.assertEqual(list(result.runs({blocks.FENCE, blocks.CODE})), [(0, 2), (3, 5)])
+        self.assertEqual(result.line_at(text.index("b")), 4)
+        self.assertEqual(result.line_region(4), (14, 15))
+        self.assertEqual(result.line_region(7), (21, 25))
@@ -0,0 +1,55 @@
+from MarkdownEditing.tests import DereferrablePanelTestCase
+
+from MarkdownEditing.plugins.headings import BREADCRUMB_KEY, MdeBreadcrumbListener
+
+
+class TestBreadcrumb(DereferrablePanelTestCase):
+
+    def setUp(self):
+        self.view.settings().set("mde.breadcrumb.enabled", True)
+        self.listener = MdeBreadcrumbListener(self.view)
+        self.setBlockText(
+            """
+            text
+
+            # Heading 1
+
+            ## Heading 1.1
+
+            ### Heading 1.1.1
+
+            text
+
+            ## Heading 1.2
+            """
+        )
+
+    def tearDown(self):
+        self.view.settings().erase("mde.breadcrumb.enabled")
+        self.view.erase_status(BREADCRUMB_KEY)
+
+    def test_breadcrumb_of_nested_section(self):
+        self.setCaretTo(9, 3)
+        self.listener.update_breadcrumb()
+        self.assertEqual(
+            self.view.get_status(BREADCRUMB_KEY), "Heading 1 › Heading 1.1 › Heading 1.1.1"
+        )
+
+    def test_breadcrumb_follows_caret(self):
+        self.setCaretTo(9, 3)
+        self.listener.update_breadcrumb()
+        self.setCaretTo(11, 1)
+        self.listener.update_breadcrumb()
+        self.assertEqual(self.view.get_status(BREADCRUMB_KEY), "Heading 1 › Heading 1.2")
+
+    def test_no_breadcrumb_before_first_heading(self):
+        self.setCaretTo(1, 1)
+        self.listener.update_breadcrumb()
+        self.assertEqual(self.view.get_status(BREADCRUMB_KEY), "")
+
+    def test_breadcrumb_disabled(self):
+        self.setCaretTo(9, 3)
+        self.listener.update_breadcrumb()
+        self.view.settings().set("mde.breadcrumb.enabled", False)
+        self.listener.update_breadcrumb()
+        self.assertEqual(self.view.get_status(BREADCRUMB_KEY), "")
@@ -0,0 +1,54 @@
+import sublime
+
+from MarkdownEditing.tests import DereferrablePanelTestCase
+
+
+class TestFoldAllBlocks(DereferrablePanelTestCase):
+
+    def setUp(self):
+        self.view.settings().set("mde.auto_fold_link.enabled", False)
+        self.setBlockText(
+            """
+            ---
+            title: Test
+            ---
+
+            ```log
+            line 1
+            line 2
+            ```
+
+            - item 1
+            - item 2
+
+            > quote
+            > more
+            """
+        )
+
+    def tearDown(self):
+        self.view.unfold(sublime.Region(0, self.view.size()))
+        self.view.settings().erase("mde.auto_fold_link.enabled")
+
+    def assertFoldedTexts(self, texts):
+        self.assertEqual([self.view.substr(r) for r in self.view.folded_regions()], texts)
+
+    def test_fold_fenced_code(self):
+        self.view.run_command("mde_fold_all_blocks", {"kinds": ["fenced_code"], "min_lines": 1})
+        self.assertFoldedTexts(["\nline 1\nline 2"])
+
+    def test_fold_frontmatter_and_quotes(self):
+        self.view.run_command(
+            "mde_fold_all_blocks", {"kinds": ["frontmatter", "quote"], "min_lines": 1}
+        )
+        self.assertFoldedTexts(["\ntitle: Test", "\n> more"])
+
+    def test_fold_lists(self):
+        self.view.run_command("mde_fold_all_blocks", {"kinds": ["list"], "min_lines": 1})
+        self.assertFoldedTexts(["\n- item 2"])
+
+    def test_min_lines(self):
+        self.view.run_command(
+            "mde_fold_all_blocks", {"kinds": ["fenced_code", "frontmatter"], "min_lines": 4}
+        )
+        self.assertFoldedTexts(["\nline 1\nline 2"])
@@ -0,0 +1,41 @@
+import os
+import shutil
+import tempfile
+
+from unittest import TestCase
+
+from MarkdownEditing.plugins.folding import FoldStateStore
+
+
+class TestFoldStateStore(TestCase):
+
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        self.cache_file = os.path.join(self.cache_dir, "fold_state.json")
+
+    def tearDown(self):
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+
+    def state(self, content_hash):
+        return {
+            "hash": content_hash,
+            "folds": [[10, 20], [30, 40]],
+            "target_level": 2,
+            "fold_links": True,
+        }
+
+    def test_put_and_get(self):
+        FoldStateStore(self.cache_file).put("/path/file.md", self.state("abc"))
+
+        # read from cache file by a new instance
+        self.assertEqual(
+            FoldStateStore(self.cache_file).get("/path/file.md", "abc"), self.state("abc")
+        )
+
+    def test_get_modified_file(self):
+        store = FoldStateStore(self.cache_file)
+        store.put("/path/file.md", self.state("abc"))
+        self.assertIsNone(store.get("/path/file.md", "def"))
+
+    def test_get_unknown_file(self):
+        self.assertIsNone(FoldStateStore(self.cache_file).get("/path/file.md", "abc"))
@@ -1,9 +1,12 @@
 import sublime
 
+from unittest import mock
+
 from MarkdownEditing.tests import DereferrablePanelTestCase
 
 # test assets
 
+from MarkdownEditing.plugins import folding
 from MarkdownEditing.plugins.headings import (
     all_headings
 )
@@ -791,3 +794,156 @@ class FoldingTestCase(DereferrablePanelTestCase):
             (367, 382),
             (417, 432)
         ])
+
+    def test_fold_all_sections__changed_target_level(self):
+        self.setCaretTo(1, 1)
+        self.view.run_command("mde_fold_all_sections", {"target_level": 2})
+
+        with mock.patch.object(folding, "fold_regions", wraps=folding.fold_regions) as fold, \
+                mock.patch.object(folding, "unfold_regions", wraps=folding.unfold_regions) as unfold:
+            self.view.run_command("mde_fold_all_sections", {"target_level": 3})
+
+        # folded urls keep untouched
+        unfold.assert_called_once_with(self.view, [
+            sublime.Region(98, 357),
+            sublime.Region(391, 435),
+            sublime.Region(450, 470),
+            sublime.Region(547, 567),
+            sublime.Region(591, 610)
+        ])
+        fold.assert_called_once_with(self.view, [
+            sublime.Region(117, 274),
+            sublime.Region(184, 199),
+            sublime.Region(292, 357),
+            sublime.Region(417, 432)
+        ])
+        self.assertFoldedRegions([
+            (37, 52),
+            (117, 274),
+            (292, 357),
+            (367, 382),
+            (417, 432)
+        ])
+
+    def test_fold_all_sections__same_target_level(self):
+        self.setCaretTo(1, 1)
+        self.view.run_command("mde_fold_all_sections", {"target_level": 2})
+        expected_regions = self.view.folded_regions()
+
+        with mock.patch.object(folding, "fold_regions", wraps=folding.fold_regions) as fold, \
+                mock.patch.object(folding, "unfold_regions", wraps=folding.unfold_regions) as unfold:
+            self.view.run_command("mde_fold_all_sections", {"target_level": 2})
+
+        unfold.assert_called_once_with(self.view, [])
+        fold.assert_called_once_with(self.view, [])
+        self.assertEqual(self.view.folded_regions(), expected_regions)
+
+    def regionArgs(self, mocked):
+        # selection listeners may refold urls before `refold_urls()` is called explicitly
+        return [region for args, _ in mocked.call_args_list for region in args[1]]
+
+    def test_refold_urls__caret_enters_and_leaves_url(self):
+        self.setCaretTo(1, 1)
+        self.view.run_command("mde_unfold_all_sections")
+        self.assertFoldedRegions([
+            (37, 52),
+            (184, 199),
+            (367, 382),
+            (417, 432)
+        ])
+
+        # caret enters url in line 3
+        with mock.patch.object(folding, "fold_regions", wraps=folding.fold_regions) as fold, \
+                mock.patch.object(folding, "unfold_regions", wraps=folding.unfold_regions) as unfold:
+            self.setCaretTo(3, 30)
+            folding.refold_urls(self.view)
+
+        self.assertEqual(self.regionArgs(fold), [])
+        self.assertEqual(self.regionArgs(unfold), [sublime.Region(37, 52)])
+        self.assertFoldedRegions([
+            (184, 199),
+            (367, 382),
+            (417, 432)
+        ])
+
+        # caret leaves url in line 3
+        with mock.patch.object(folding, "fold_regions", wraps=folding.fold_regions) as fold, \
+                mock.patch.object(folding, "unfold_regions", wraps=folding.unfold_regions) as unfold:
+            self.setCaretTo(1, 1)
+            folding.refold_urls(self.view)
+
+        self.assertEqual(self.regionArgs(fold), [sublime.Region(37, 52)])
+        self.assertEqual(self.regionArgs(unfold), [])
+        self.assertFoldedRegions([
+            (37, 52),
+            (184, 199),
+            (367, 382),
+            (417, 432)
+        ])
+
+    def test_unfold_section_enabled__folded_by_api(self):
+        self.setCaretTo(1, 1)
+        self.view.run_command("unfold_all")
+        command = folding.MdeUnfoldSectionCommand(self.view)
+        self.assertFalse(command.is_enabled())
+
+        # folds changed without modifications or fold commands
+        self.view.fold(sublime.Region(11, 470))
+        self.assertTrue(command.is_enabled())
+        self.assertEqual(
+            folding.folded_regions(self.view).containing(sublime.Region(100, 200)),
+            sublime.Region(11, 470)
+        )
+
+        self.view.unfold(sublime.Region(11, 470))
+        self.assertFalse(command.is_enabled())
+
+
+class TestDeferredFolding(DereferrablePanelTestCase):
+
+    def setUp(self):
+        self.view.settings().set("mde.auto_fold_link.enabled", False)
+        self.setText("".join("Line [link {0}](https://url/{0}) text\n".format(i) for i in range(500)))
+        self.view.run_command("unfold_all")
+
+    def tearDown(self):
+        self.view.run_command("unfold_all")
+        self.view.settings().erase("mde.auto_fold_link.enabled")
+        self.view.settings().erase("mde.auto_fold_link.viewport_threshold")
+
+    def test_fold_deferred__modified_before_folding(self):
+        change_count = self.view.change_count()
+        self.view.run_command("insert", {"characters": "x"})
+        folding.fold_deferred(self.view, folding.url_regions(self.view), change_count)
+        yield 200
+        self.assertEqual(self.view.folded_regions(), [])
+
+    def test_fold_deferred__drop_pending_chunks(self):
+        regions = list(folding.url_regions(self.view))
+        visible = self.view.visible_region()
+        expected = [r for r in regions if r.end() >= visible.begin() and r.begin() <= visible.end()]
+
+        folding.fold_deferred(self.view, regions, self.view.change_count(), chunk_size=10)
+        # modify view before pending chunks are folded, without moving any url
+        self.view.sel().clear()
+        self.view.sel().add(self.view.size())
+        self.view.run_command("insert", {"characters": "x"})
+        yield 200
+        self.assertEqual(self.view.folded_regions(), expected)
+
+    def test_urls_to_fold__viewport_threshold(self):
+        self.view.settings().set("mde.auto_fold_link.enabled", True)
+        self.view.settings().set("mde.auto_fold_link.viewport_threshold", 100)
+        self.setCaretTo(1, 1)
+
+        visible = self.view.visible_region()
+        margin = visible.size()
+        expected = [
+            r for r in folding.url_regions(self.view)
+            if visible.begin() - margin <= r.begin() <= visible.end() + margin
+        ]
+        self.assertEqual(folding.urls_to_fold(self.view), expected)
+
+        # all urls are folded below threshold
+        self.view.settings().set("mde.auto_fold_link.viewport_threshold", 1000)
+        self.assertEqual(folding.urls_to_fold(self.view), folding.url_regions(self.view))
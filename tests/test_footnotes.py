@@ -1,5 +1,20 @@
+import sublime
+
+from collections import namedtuple
+from unittest import TestCase
+
+from MarkdownEditing.plugins.footnotes import (
+    DIRTY_KEY,
+    changed_regions,
+    get_footnote_definition_markers,
+    get_footnote_references,
+    splice_regions,
+)
 from MarkdownEditing.tests import DereferrablePanelTestCase
 
+Position = namedtuple("Position", ["pt"])
+Change = namedtuple("Change", ["a", "b", "str"])
+
 
 class TestMdeReferenceNewFootnoteCommand(DereferrablePanelTestCase):
 
@@ -76,3 +91,204 @@ class TestMdeReferenceNewFootnoteCommand(DereferrablePanelTestCase):
             [^2]:\x20
             """
         )
+
+
+class TestMdeRenumberFootnotesCommand(DereferrablePanelTestCase):
+
+    def setUp(self):
+        self.setBlockText(
+            """
+            First[^3] second[^note] third[^1] again[^3].
+
+            [^1]: one
+            [^3]: three
+            [^7]: seven
+            [^note]: named
+            """
+        )
+
+    def test_renumber_numeric_footnotes(self):
+        self.view.run_command("mde_renumber_footnotes")
+        self.assertEqualBlockText(
+            """
+            First[^1] second[^note] third[^2] again[^1].
+
+            [^2]: one
+            [^1]: three
+            [^3]: seven
+            [^note]: named
+            """
+        )
+
+    def test_renumber_named_footnotes(self):
+        self.view.run_command("mde_renumber_footnotes", {"named": True})
+        self.assertEqualBlockText(
+            """
+            First[^1] second[^2] third[^3] again[^1].
+
+            [^3]: one
+            [^1]: three
+            [^4]: seven
+            [^2]: named
+            """
+        )
+
+
+class TestChangedRegions(TestCase):
+
+    def change(self, begin, end, text):
+        return Change(Position(begin), Position(end), text)
+
+    def test_single_insertion(self):
+        self.assertEqual(changed_regions([self.change(5, 5, "abc")]), [(5, 8)])
+
+    def test_deletion_before_shifts_region(self):
+        self.assertEqual(
+            changed_regions([self.change(5, 5, "abc"), self.change(0, 2, "")]),
+            [(3, 6), (0, 0)]
+        )
+
+    def test_overlapping_changes_are_merged(self):
+        self.assertEqual(
+            changed_regions([self.change(5, 5, "abc"), self.change(7, 10, "x")]),
+            [(5, 8)]
+        )
+
+    def test_distinct_changes(self):
+        self.assertEqual(
+            changed_regions([self.change(5, 5, "abc"), self.change(20, 20, "x")]),
+            [(5, 8), (20, 21)]
+        )
+
+
+class TestSpliceRegions(TestCase):
+
+    def regions(self, *pairs):
+        return [sublime.Region(a, b) for a, b in pairs]
+
+    def test_keep_regions_of_following_line(self):
+        self.assertEqual(
+            splice_regions(
+                self.regions((0, 5), (10, 15), (20, 25)),
+                self.regions((0, 10)),
+                self.regions((0, 5)),
+            ),
+            self.regions((0, 5), (10, 15), (20, 25))
+        )
+
+    def test_replace_regions_of_modified_line(self):
+        self.assertEqual(
+            splice_regions(
+                self.regions((0, 5), (10, 15), (20, 25)),
+                self.regions((10, 20)),
+                self.regions((11, 14)),
+            ),
+            self.regions((0, 5), (11, 14), (20, 25))
+        )
+
+    def test_drop_removed_regions(self):
+        self.assertEqual(
+            splice_regions(
+                self.regions((0, 5), (10, 15), (20, 25)),
+                self.regions((0, 20)),
+                [],
+            ),
+            self.regions((20, 25))
+        )
+
+
+class TestFootnoteTracking(DereferrablePanelTestCase):
+
+    def test_edit_line_above_definition(self):
+        self.setBlockText(
+            """
+            Text[^1] and[^2] and[^3].
+
+            [^1]: one
+            [^2]: two
+            [^3]: three
+            """
+        )
+        self.assertEqual(sorted(get_footnote_definition_markers(self.view)), ["1", "2", "3"])
+
+        self.setCaretTo(3, 10)
+        self.view.run_command("insert", {"characters": " more"})
+        self.view.add_regions(
+            DIRTY_KEY, [self.view.full_line(self.textPoint(3, 1))], "", "", sublime.HIDDEN
+        )
+        self.assertEqual(sorted(get_footnote_definition_markers(self.view)), ["1", "2", "3"])
+        self.assertEqual(sorted(get_footnote_references(self.view)), ["1", "2", "3"])
+
+
+class TestGotoFootnote(DereferrablePanelTestCase):
+
+    def setUp(self):
+        self.setBlockText(
+            """
+            Text[^1] and[^2].
+
+            [^1]: see [^2]
+            [^2]: two
+            """
+        )
+
+    def test_goto_definition_from_partially_selected_reference(self):
+        self.view.sel().clear()
+        self.view.sel().add(sublime.Region(self.textPoint(1, 3), self.textPoint(1, 7)))
+        self.view.run_command("mde_goto_footnote_definition")
+        self.assertEqual(self.view.substr(self.view.sel()[0]), "[^1]:")
+        self.assertCaretAt(3, 1)
+
+    def test_goto_reference_skips_definition_lines(self):
+        self.setCaretTo(4, 1)
+        self.view.run_command("mde_goto_footnote_reference")
+        self.assertEqual(len(self.view.sel()), 1)
+        self.assertCaretAt(1, 13)
+
+
+class TestMdeSortFootnotesCommand(DereferrablePanelTestCase):
+
+    def test_sort_multi_paragraph_definitions(self):
+        self.setBlockText(
+            """
+            Text[^b] and[^a].
+
+            [^a]: first
+
+                second paragraph of a
+
+            [^b]: note b
+
+            More text.
+            """
+        )
+        self.view.run_command("mde_sort_footnotes")
+        self.assertEqualText(
+            "Text[^b] and[^a].\n\nMore text.\n\n [^b]: note b\n\n"
+            " [^a]: first\n\n    second paragraph of a"
+        )
+
+    def test_sort_adjacent_definitions(self):
+        self.setBlockText(
+            """
+            Text[^2] and[^1].
+
+            [^1]: one
+            [^2]: two
+            """
+        )
+        self.view.run_command("mde_sort_footnotes")
+        self.assertEqualText("Text[^2] and[^1].\n\n\n\n [^2]: two\n\n [^1]: one")
+
+    def test_sort_skips_undefined_references(self):
+        self.setBlockText(
+            """
+            Text[^1] and[^2] and[^3].
+
+            [^3]: three
+
+            [^1]: one
+            """
+        )
+        self.view.run_command("mde_sort_footnotes")
+        self.assertEqualText("Text[^1] and[^2] and[^3].\n\n\n\n [^1]: one\n\n [^3]: three")
@@ -0,0 +1,125 @@
+from MarkdownEditing.tests import DereferrablePanelTestCase
+
+
+class TestMdeMoveSectionCommand(DereferrablePanelTestCase):
+
+    def test_move_section_up_with_child_sections(self):
+        self.setBlockText(
+            """
+            # Heading 1
+
+            Text 1
+
+            # Heading 2
+
+            Text 2
+
+            ## Heading 2.1
+
+            Text 2.1
+
+            # Heading 3
+            """
+        )
+        self.setCaretTo(7, 3)
+        self.view.run_command("mde_move_section_up")
+        self.assertEqualBlockText(
+            """
+            # Heading 2
+
+            Text 2
+
+            ## Heading 2.1
+
+            Text 2.1
+
+            # Heading 1
+
+            Text 1
+
+            # Heading 3
+            """
+        )
+        self.assertCaretAt(3, 3)
+
+    def test_move_section_down_with_child_sections(self):
+        self.setBlockText(
+            """
+            # Heading 1
+
+            ## Heading 1.1
+
+            Text 1.1
+
+            ## Heading 1.2
+
+            Text 1.2
+
+            # Heading 2
+            """
+        )
+        self.setCaretTo(5, 1)
+        self.view.run_command("mde_move_section_down")
+        self.assertEqualBlockText(
+            """
+            # Heading 1
+
+            ## Heading 1.2
+
+            Text 1.2
+
+            ## Heading 1.1
+
+            Text 1.1
+
+            # Heading 2
+            """
+        )
+        self.assertCaretAt(9, 1)
+
+    def test_move_section_down_to_end_of_document(self):
+        self.setBlockText(
+            """
+            # Heading 1
+
+            Text 1
+
+            # Heading 2
+            Text 2
+            """
+        )
+        self.setCaretTo(1, 1)
+        self.view.run_command("mde_move_section_down")
+        self.assertEqualBlockText(
+            """
+            # Heading 2
+            Text 2
+
+            # Heading 1
+
+            Text 1
+            """
+        )
+        self.assertCaretAt(4, 1)
+
+    def test_move_section_up_without_sibling(self):
+        self.setBlockText(
+            """
+            # Heading 1
+
+            ## Heading 1.1
+
+            # Heading 2
+            """
+        )
+        self.setCaretTo(3, 1)
+        self.view.run_command("mde_move_section_up")
+        self.assertEqualBlockText(
+            """
+            # Heading 1
+
+            ## Heading 1.1
+
+            # Heading 2
+            """
+        )
@@ -0,0 +1,41 @@
+from MarkdownEditing.tests import DereferrablePanelTestCase
+
+from MarkdownEditing.plugins.headings import heading_index, outline_items
+
+
+class TestOutlineItems(DereferrablePanelTestCase):
+
+    def setUp(self):
+        self.setBlockText(
+            """
+            # Heading 1
+
+            ## Heading 1.1
+
+            text
+
+            ### Heading 1.1.1
+
+            ## Heading 1.2
+
+            # Heading 2
+            """
+        )
+
+    def test_outline_items(self):
+        self.assertEqual(
+            outline_items(heading_index(self.view)),
+            [
+                ("Heading 1", "line 1, 3 subheadings"),
+                ("    Heading 1.1", "line 3, 1 subheadings"),
+                ("        Heading 1.1.1", "line 7, 0 subheadings"),
+                ("    Heading 1.2", "line 9, 0 subheadings"),
+                ("Heading 2", "line 11, 0 subheadings"),
+            ],
+        )
+
+    def test_outline_selection(self):
+        self.setCaretTo(5, 3)
+        self.assertEqual(heading_index(self.view).heading_at(self.view.sel()[0].begin()), 1)
+        self.setCaretTo(10, 1)
+        self.assertEqual(heading_index(self.view).heading_at(self.view.sel()[0].begin()), 3)
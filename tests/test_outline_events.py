@@ -0,0 +1,82 @@
+from MarkdownEditing.tests import DereferrablePanelTestCase
+
+from MarkdownEditing.plugins.headings import (
+    add_outline_listener,
+    heading_index,
+    remove_outline_listener,
+)
+
+
+class TestOutlineEvents(DereferrablePanelTestCase):
+
+    def setUp(self):
+        self.events = []
+        add_outline_listener(self.on_outline_changed)
+
+    def tearDown(self):
+        remove_outline_listener(self.on_outline_changed)
+
+    def on_outline_changed(self, view, events):
+        if view == self.view:
+            self.events.extend((e.kind, e.heading, e.level, e.title) for e in events)
+
+    def modify(self, row, col, characters):
+        heading_index(self.view)
+        self.setCaretTo(row, col)
+        self.view.run_command("insert", {"characters": characters})
+        heading_index(self.view)
+
+    def test_body_modification(self):
+        self.setBlockText(
+            """
+            # Heading
+
+            text
+            """
+        )
+        self.modify(3, 5, " more text")
+        self.assertEqual(self.events, [])
+
+    def test_heading_added(self):
+        self.setBlockText(
+            """
+            # Heading
+
+            text
+            """
+        )
+        self.modify(3, 1, "## Sub\n")
+        self.assertEqual(self.events, [("added", 1, 2, "Sub")])
+
+    def test_heading_removed(self):
+        self.setBlockText(
+            """
+            # Heading
+
+            ## Sub
+            """
+        )
+        self.modify(3, 1, "text ")
+        self.assertEqual(self.events, [("removed", 1, 2, "Sub")])
+
+    def test_heading_renamed(self):
+        self.setBlockText(
+            """
+            # Heading
+
+            ## Sub
+            """
+        )
+        self.modify(3, 7, "title")
+        self.assertEqual(self.events, [("renamed", 1, 2, "Subtitle")])
+
+    def test_heading_level_changed(self):
+        self.setBlockText(
+            """
+            # Heading
+
+            ## Sub
+            """
+        )
+        self.modify(3, 1, "#")
+        self.assertEqual(self.events, [("level_changed", 1, 3, "Sub")])
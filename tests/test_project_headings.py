@@ -0,0 +1,62 @@
+from unittest import TestCase
+
+from MarkdownEditing.plugins.headings import broken_links, text_headings
+
+
+class TestTextHeadings(TestCase):
+
+    def test_text_headings(self):
+        text = "\n".join(
+            [
+                "---",
+                "# no heading",
+                "---",
+                "# Heading 1 #",
+                "",
+                "```",
+                "# no heading",
+                "```",
+                "",
+                "Heading 2",
+                "---------",
+                "",
+                "~~~~",
+                "## no heading",
+            ]
+        )
+        self.assertEqual(
+            text_headings(text),
+            [
+                [3, 1, "Heading 1"],
+                [9, 2, "Heading 2"],
+            ]
+        )
+
+
+class TestBrokenLinks(TestCase):
+
+    def test_broken_links(self):
+        slugs = {
+            "/docs/guide/setup.md": {"install", "usage"},
+            "/docs/index.md": {"intro"},
+        }
+        text = "\n".join(
+            [
+                "# Intro",
+                "",
+                "[ok](guide/setup.md#install) [ok](#intro) [url](https://foo.bar/x.md#y)",
+                "[bad](guide/setup.md#missing)",
+                "```",
+                "[raw](missing.md)",
+                "```",
+                "  [bad](missing.md) [bad](#missing)",
+            ]
+        )
+        self.assertEqual(
+            list(broken_links(text, "/docs/index.md", slugs.get, [".md"])),
+            [
+                (3, 6, "missing anchor '#missing' in 'guide/setup.md'"),
+                (7, 8, "missing file 'missing.md'"),
+                (7, 26, "missing anchor '#missing' in 'this file'"),
+            ]
+        )
@@ -0,0 +1,66 @@
+from unittest import TestCase
+
+from MarkdownEditing.plugins.view import RegionCache
+
+
+class FakeView:
+
+    def __init__(self, view_id):
+        self.view_id = view_id
+        self.changes = 0
+        self.queries = 0
+
+    def id(self):
+        return self.view_id
+
+    def change_count(self):
+        return self.changes
+
+    def find_by_selector(self, selector):
+        self.queries += 1
+        return [(self.view_id, selector, self.changes)]
+
+
+class TestRegionCache(TestCase):
+
+    def test_cached_until_modified(self):
+        cache = RegionCache()
+        view = FakeView(1)
+        cache.find_by_selector(view, "a")
+        cache.find_by_selector(view, "a")
+        self.assertEqual(view.queries, 1)
+
+        view.changes += 1
+        self.assertEqual(cache.find_by_selector(view, "a"), [(1, "a", 1)])
+        self.assertEqual(view.queries, 2)
+
+    def test_evict_least_recently_used(self):
+        cache = RegionCache(max_entries=2)
+        first = FakeView(1)
+        second = FakeView(2)
+        cache.find_by_selector(first, "a")
+        cache.find_by_selector(second, "a")
+        cache.find_by_selector(first, "a")
+        cache.find_by_selector(first, "b")
+        self.assertEqual(list(cache.entries), [(1, "a"), (1, "b")])
+
+    def test_refreshed_entry_is_most_recently_used(self):
+        cache = RegionCache(max_entries=2)
+        first = FakeView(1)
+        second = FakeView(2)
+        cache.find_by_selector(first, "a")
+        cache.find_by_selector(second, "a")
+        first.changes += 1
+        cache.find_by_selector(first, "a")
+        cache.find_by_selector(first, "b")
+        self.assertEqual(list(cache.entries), [(1, "a"), (1, "b")])
+
+    def test_pop_view(self):
+        cache = RegionCache()
+        first = FakeView(1)
+        second = FakeView(2)
+        cache.find_by_selector(first, "a")
+        cache.find_by_selector(first, "b")
+        cache.find_by_selector(second, "a")
+        cache.pop(1)
+        self.assertEqual(list(cache.entries), [(2, "a")])
@@ -0,0 +1,84 @@
+from MarkdownEditing.tests import DereferrablePanelTestCase
+
+from MarkdownEditing.plugins.headings import unique_slugs
+
+
+class TestMdeUpdateTocCommand(DereferrablePanelTestCase):
+
+    def setUp(self):
+        self.view.settings().set("translate_tabs_to_spaces", True)
+        self.view.settings().set("tab_size", 2)
+
+    def tearDown(self):
+        self.view.settings().erase("translate_tabs_to_spaces")
+        self.view.settings().erase("tab_size")
+
+    def test_unique_slugs(self):
+        self.assertEqual(
+            unique_slugs(["Foo", "Foo", "Foo-1", "[Link](url) *Bar*!", "Foo"]),
+            ["foo", "foo-1", "foo-1-1", "link-bar", "foo-2"]
+        )
+
+    def test_insert_toc(self):
+        self.setBlockText(
+            """
+            # Title
+
+            ## Install
+
+            ### Linux
+
+            ## Install
+            """
+        )
+        self.setCaretTo(2, 1)
+        self.view.run_command("mde_update_toc")
+        self.assertEqualBlockText(
+            """
+            # Title
+            <!-- TOC -->
+            - [Title](#title)
+              - [Install](#install)
+                - [Linux](#linux)
+              - [Install](#install-1)
+            <!-- /TOC -->
+
+            ## Install
+
+            ### Linux
+
+            ## Install
+            """
+        )
+
+    def test_update_toc(self):
+        self.setBlockText(
+            """
+            # Title
+
+            <!-- TOC -->
+            - [Title](#title)
+              - [Install](#install)
+            <!-- /TOC -->
+
+            ## Setup
+
+            ### Linux
+            """
+        )
+        self.view.run_command("mde_update_toc")
+        self.assertEqualBlockText(
+            """
+            # Title
+
+            <!-- TOC -->
+            - [Title](#title)
+              - [Setup](#setup)
+                - [Linux](#linux)
+            <!-- /TOC -->
+
+            ## Setup
+
+            ### Linux
+            """
+        )
@@ -0,0 +1,90 @@
+from MarkdownEditing.tests import DereferrablePanelTestCase
+
+
+class TestMdeConvertUnderlinedHeadingsToAtxCommand(DereferrablePanelTestCase):
+
+    def test_convert_underlined_headings(self):
+        self.setBlockText(
+            """
+            Heading 1
+            =========
+
+            Paragraph
+
+            Heading 2
+            ---
+
+            ```
+            Raw
+            ---
+            ```
+            """
+        )
+        self.setCaretTo(4, 5)
+        self.view.run_command("mde_convert_underlined_headings_to_atx")
+        self.assertEqualBlockText(
+            """
+            # Heading 1
+
+            Paragraph
+
+            ## Heading 2
+
+            ```
+            Raw
+            ---
+            ```
+            """
+        )
+        self.assertCaretAt(3, 5)
+
+    def test_convert_underlined_headings_closed(self):
+        self.setBlockText(
+            """
+            Heading 1
+            =========
+
+            Heading 2
+            ---------
+            """
+        )
+        self.view.run_command("mde_convert_underlined_headings_to_atx", {"closed": True})
+        self.assertEqualBlockText(
+            """
+            # Heading 1 #
+
+            ## Heading 2 ##
+            """
+        )
+
+
+class TestMdeFixUnderlinedHeadingsCommand(DereferrablePanelTestCase):
+
+    def test_fix_underlined_headings(self):
+        self.setBlockText(
+            """
+            Heading 1
+            ===
+
+            Heading 2
+            --------------
+
+            ---
+
+            Paragraph
+            """
+        )
+        self.view.run_command("mde_fix_underlined_headings")
+        self.assertEqualBlockText(
+            """
+            Heading 1
+            =========
+
+            Heading 2
+            ---------
+
+            ---
+
+            Paragraph
+            """
+        )